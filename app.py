@@ -1,23 +1,34 @@
 # Imports
 from project import db, app
 from project.decorators import permission_required
-from flask import render_template, redirect, request, url_for, flash, send_from_directory, send_file, current_app, session
+from flask import render_template, redirect, request, url_for, flash, send_from_directory, session, jsonify, Response
 from flask_login import login_user, login_required, logout_user, current_user
-from project.models import User, Document, Hours, ActivityLog, Task, TaskAssignment
+from project.models import User, Document, Hours, Task
 from project.forms import RegistrationForm, LoginForm, AddHoursForm, EditProfile, CreateTasksForm, CreateTaskAssignmentForm
-from project.activity import log_event
-
-from fileinput import filename
+from project.activity import log_event, activity_feed_page, resolve_targets, ACTIONS, TARGET_TYPES
+from project.pagination import page_size
+from project.certificates import certificate_response, certificate_cache, certificate_export_users, certificate_zip_stream
+from project.uploads import stage_upload, UploadTooLarge, blob_path, release_blobs, send_document
+from project.derivatives import optimize_documents, optimize_documents_later, unoptimized_document_ids
+from project.search import search_documents, hit_to_dict, index_documents, index_documents_later, unindex_documents, unindexed_document_ids
+from project.assets import send_asset, write_manifest
+from project.compression import compress_response
+from project.avatars import process_avatar, InvalidImage, DEFAULT_PICTURE, DEFAULT_KEY
+from project.hours import change_hours_status, change_hours_statuses, hours_drift, fix_hours_drift, HOURS_STATUSES, MAX_BULK_HOURS
+from project.principal import user_cache, current_user_record
+from project.users import search_users, user_rows_page, user_to_dict, USER_ROLES, TYPEAHEAD_SIZE
+from project.tasks import assign_task, role_recipients, bucketed_assignments, task_overview_page, TASK_ROLES, OVERVIEW_SORTS
+from project.review_queue import pending_hours_page, hours_to_dict, pending_documents_page, document_to_dict, change_document_statuses, DOCUMENT_STATUSES, MAX_BULK_DOCUMENTS
+
+import click
 import random
 import os
 from werkzeug.utils import secure_filename
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-import io
-from datetime import datetime
+from datetime import date
+
 
+# gzip/brotli for HTML and JSON responses
+app.after_request(compress_response)
 
 # Mapping user roles to their dashboard route names
 redirect_target = {
@@ -115,6 +126,7 @@ def upgrade_user():
         }
     )
     db.session.commit()
+    user_cache.invalidate(user.id)  # the new role applies from their next request
 
     flash(f"User {user.name} has been changed to {user.role} .")
     return redirect(url_for(redirect_target.get(current_user.role, "board_dashboard")))
@@ -148,8 +160,13 @@ def delete_user():
         }
     )
 
+    blob_hashes = [h for doc in user.documents for h in (doc.sha256, doc.web_sha256)]
+    unindex_documents([doc.id for doc in user.documents])
+
     db.session.delete(user)  # Delete user from database
     db.session.commit()
+    user_cache.invalidate(user_id)
+    release_blobs(blob_hashes)  # remove files nobody else uploaded
     flash(f"User {user_name} has been deleted.")
     return redirect(url_for(redirect_target.get(current_user.role, "board_dashboard")))
     
@@ -177,16 +194,14 @@ def volunteer_dashboard():
 @login_required
 @permission_required('board')
 def board_dashboard():
-    user = User.query.all()  # Get all users
-    return render_template("board_home.html", user = user)
+    return render_template("board_home.html")
 
 # Dashboard for admin (admin role only)
 @app.route("/admin/dashboard")
 @login_required
 @permission_required('admin')
 def admin_dashboard():
-    user = User.query.all()  # Get all users
-    return render_template("admin_home.html", user = user)
+    return render_template("admin_home.html")
 
 @app.route("/specific/log/hours", methods=["GET", "POST"])
 @login_required
@@ -235,7 +250,7 @@ def hours_log():
                     end_time=form.data['end_time'],
                     amount=form.data['amount'],
                     description=form.data['description'],
-                    user=current_user
+                    user=current_user_record()
                 )
                 db.session.add(log)
                 db.session.commit()
@@ -261,8 +276,11 @@ def hours_log():
         return render_template("hours_log.html", form=form)
     
     else:  # board or admin
-        users = User.query.all()
-        return render_template("hours_log.html", users=users)
+        page = user_rows_page(
+            cursor=request.args.get('cursor'),
+            limit=page_size(request.args.get('limit', type=int))
+        )
+        return render_template("hours_log.html", users=page.items, next_cursor=page.next_cursor)
 
 @app.route("/hours/log/update_status/", methods=["POST"])
 @login_required
@@ -270,56 +288,81 @@ def hours_log():
 def update_hours_log_status():
     log_id = request.form.get("log_id", type=int)  
     new_status = request.form.get("new_status", type=str)  
-    log = Hours.query.get(log_id)
-    old_status = log.status
-    if log:
-
-        if new_status == "Approved":
-            user = User.query.get(log.user_id)
-            user.total_hours += log.amount
-            
-            log_event(
-                actor=current_user,
-                action="hours_status_changed",
-                target_type="Hours",
-                target_id=log.id,
-                details={
-                    "old_status": old_status,
-                    "new_status": new_status,
-                    "amount": log.amount,
-                    "user_id": log.user_id
-                }
-            )
-
-        elif log.status == "Approved" and new_status in ["Denied", "Pending"]:
-            user = User.query.get(log.user_id)
-            user.total_hours -= log.amount
+    if new_status not in HOURS_STATUSES:
+        flash("Unknown status.")
+        return redirect(request.referrer or url_for('pending_hours'))
 
+    # Conditional UPDATE + SQL increment, safe against concurrent approvals
+    changed = change_hours_status(log_id, new_status, actor=current_user)
+    db.session.commit()
+    if changed:
+        user_id, _ = changed
+        certificate_cache.invalidate_user(user_id)  # total_hours may have changed
+        return redirect(request.referrer or url_for('specific_log_hours', user_id=user_id))
+    return redirect(request.referrer or url_for('pending_hours'))
 
-            log_event(
-                actor=current_user,
-                action="hours_status_changed",
-                target_type="Hours",
-                target_id=log.id,
-                details={
-                    "old_status": old_status,
-                    "new_status": new_status,
-                    "amount": log.amount,
-                    "user_id": log.user_id
-                }
-            )
-
-        log.status = new_status
-        db.session.commit()
+@app.route("/hours/bulk_status", methods=["POST"])
+@login_required
+@permission_required('board')
+def bulk_update_hours_status():
+    """
+    Approve/deny/reset many hours entries at once: set-based UPDATEs, one
+    activity-log INSERT and a single commit. Accepts a form (log_id repeated)
+    or JSON {"log_ids": [...], "new_status": "..."}.
+    """
+    if request.is_json:
+        payload = request.get_json(silent=True) or {}
+        log_ids = [i for i in payload.get("log_ids", []) if isinstance(i, int)]
+        new_status = payload.get("new_status")
+    else:
+        log_ids = request.form.getlist("log_id", type=int)
+        new_status = request.form.get("new_status", type=str)
+
+    error = None
+    if new_status not in HOURS_STATUSES:
+        error = "Unknown status."
+    elif not log_ids:
+        error = "No hours selected."
+    elif len(log_ids) > MAX_BULK_HOURS:
+        error = f"At most {MAX_BULK_HOURS} entries can be updated at once."
+    if error:
+        if request.is_json:
+            return jsonify(error=error), 400
+        flash(error)
+        return redirect(request.referrer or url_for('pending_hours'))
+
+    changed = change_hours_statuses(log_ids, new_status, actor=current_user)
+    db.session.commit()
+    for user_id in {user_id for _, user_id, _ in changed}:
+        certificate_cache.invalidate_user(user_id)  # total_hours may have changed
 
-    return redirect(request.referrer or url_for('specific_log_hours', user_id=log.user_id))
+    changed_ids = [log_id for log_id, _, _ in changed]
+    if request.is_json:
+        unchanged = sorted(set(log_ids) - set(changed_ids))
+        return jsonify(updated=sorted(changed_ids), unchanged=unchanged, new_status=new_status)
+    flash(f"{len(changed_ids)} hours entries marked {new_status}.")
+    return redirect(request.referrer or url_for('pending_hours'))
 
 @app.route('/pending/hours', methods=['GET'])
 @login_required
 @permission_required('board')
 def pending_hours():
-    users = User.query.all()  # Get all users
-    return render_template('pending_hours.html', users= users)
+    # Only the current page of pending hours is loaded, owners included
+    page = pending_hours_page(
+        cursor=request.args.get('cursor'),
+        limit=page_size(request.args.get('limit', type=int))
+    )
+    return render_template('pending_hours.html', logs=page.items, next_cursor=page.next_cursor)
+
+@app.route('/pending/hours/json', methods=['GET'])
+@login_required
+@permission_required('board')
+def pending_hours_json():
+    page = pending_hours_page(
+        cursor=request.args.get('cursor'),
+        limit=page_size(request.args.get('limit', type=int))
+    )
+    return jsonify(items=[hours_to_dict(log) for log in page.items], next_cursor=page.next_cursor)
 
 # if volunteer or intern, view the documents they've uploaded and their status
 # if board or admin, view all documents and status and ability to change their status
@@ -340,19 +383,42 @@ def document_status():
                                            msg="File extension not allowed", 
                                            allGood = False, justTriedUpload=True) 
                     
-        for f in uploaded_files:
-            if f.filename:  # skip empty uploads
-                f.save(os.path.join(app.config['UPLOAD_PATH'], f.filename))
-                saved_files.append(f.filename)
-                description = request.form.get("description", type=str)  # Get description from form
+        # Stream every file to a temp file first (size-limited, hashed on the fly),
+        # so a bad file in the batch leaves nothing behind
+        staged = []
+        try:
+            for f in uploaded_files:
+                if f.filename:  # skip empty uploads
+                    staged.append((f, stage_upload(f, app.config['UPLOAD_PATH'], app.config['MAX_UPLOAD_BYTES'])))
+        except UploadTooLarge as e:
+            for _, upload in staged:
+                upload.discard()
+            max_mb = app.config['MAX_UPLOAD_BYTES'] // (1024 * 1024)
+            return render_template("document_status_list.html",
+                                   names=saved_files,
+                                   msg=f"{e} is larger than the {max_mb} MB limit",
+                                   allGood = False, justTriedUpload=True)
+
+        # Move the files into the blob store (identical content is only kept once)
+        # and record them all in a single transaction
+        description = request.form.get("description", type=str)  # Get description from form
+        uploaded_ids = []
+        try:
+            for f, upload in staged:
+                filename = secure_filename(f.filename)
+                upload.commit(blob_path(upload.sha256))
+                saved_files.append(filename)
                 document = Document(
-                    filename=f.filename,
+                    filename=filename,
                     doctype=f.content_type,
                     description = description,
-                    user=current_user
+                    user=current_user_record(),
+                    sha256=upload.sha256,
+                    size=upload.size
                 )
                 db.session.add(document)
-                db.session.commit()
+                db.session.flush()  # assigns document.id without committing
+                uploaded_ids.append(document.id)
 
                 log_event(
                     actor=current_user,
@@ -361,10 +427,20 @@ def document_status():
                     target_id=document.id,
                     details={
                         "filename": document.filename,
-                        "doctype": document.doctype
+                        "doctype": document.doctype,
+                        "size": upload.size,
+                        "sha256": upload.sha256
                     }
                 )
-                db.session.commit()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            for _, upload in staged:
+                upload.discard()
+            raise
+        # web-optimised copy and search text are produced off the request
+        optimize_documents_later(uploaded_ids)
+        index_documents_later(uploaded_ids)
                                     
         return render_template("document_status_list.html", 
                                names=saved_files, 
@@ -372,12 +448,14 @@ def document_status():
                                allGood = True, justTriedUpload=True)
     
     if current_user.role in ['volunteer', 'intern']:
-        documents = Document.query.filter_by(user_id=current_user.id).all()
-        return render_template("document_status_list.html", documents=documents, role=current_user.role)
+        return render_template("document_status_list.html", role=current_user.role)
     else:  # board or admin
-        documents = Document.query.all()
-        users = User.query.all()
-        return render_template("document_status_list.html", documents=documents, users=users, role=current_user.role)
+        page = user_rows_page(
+            cursor=request.args.get('cursor'),
+            limit=page_size(request.args.get('limit', type=int))
+        )
+        return render_template("document_status_list.html", users=page.items, next_cursor=page.next_cursor,
+                               role=current_user.role)
     
 @app.route("/documents/update_status/", methods=["POST"])
 @login_required
@@ -385,22 +463,52 @@ def document_status():
 def update_document_status():
     doc_id = request.form.get("doc_id", type=int)  
     new_status = request.form.get("new_status", type=str)  
-    document = Document.query.get(doc_id)
-    old_status = document.status
-    if document:
-        log_event(
-            actor=current_user,
-            action="document_status_changed",
-            target_type="Document",
-            target_id=document.id,
-            details={
-                "old_status": old_status,
-                "new_status": new_status
-            }
-        )
-        document.status = new_status
+    if new_status not in DOCUMENT_STATUSES:
+        flash("Unknown status.")
+    elif change_document_statuses([doc_id], new_status, actor=current_user).get(doc_id) == "not_found":
+        flash("Document not found.")
+    else:
         db.session.commit()
     return redirect(request.referrer or url_for('document_status'))
+
+@app.route("/documents/bulk_status", methods=["POST"])
+@login_required
+@permission_required('board')
+def bulk_update_document_status():
+    """
+    Set the status of many documents in one round trip. Accepts a form
+    (doc_id repeated) or JSON {"doc_ids": [...], "new_status": "..."}; JSON
+    callers get a result per ID back.
+    """
+    if request.is_json:
+        payload = request.get_json(silent=True) or {}
+        doc_ids = [i for i in payload.get("doc_ids", []) if isinstance(i, int)]
+        new_status = payload.get("new_status")
+    else:
+        doc_ids = request.form.getlist("doc_id", type=int)
+        new_status = request.form.get("new_status", type=str)
+
+    error = None
+    if new_status not in DOCUMENT_STATUSES:
+        error = "Unknown status."
+    elif not doc_ids:
+        error = "No documents selected."
+    elif len(doc_ids) > MAX_BULK_DOCUMENTS:
+        error = f"At most {MAX_BULK_DOCUMENTS} documents can be updated at once."
+    if error:
+        if request.is_json:
+            return jsonify(error=error), 400
+        flash(error)
+        return redirect(request.referrer or url_for('pending_documents'))
+
+    results = change_document_statuses(doc_ids, new_status, actor=current_user)
+    db.session.commit()
+
+    if request.is_json:
+        return jsonify(new_status=new_status, results={str(doc_id): result for doc_id, result in results.items()})
+    updated = sum(1 for result in results.values() if result == "updated")
+    flash(f"{updated} documents marked {new_status}.")
+    return redirect(request.referrer or url_for('pending_documents'))
         
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['UPLOAD_EXTENSIONS']
@@ -429,13 +537,9 @@ def specific_log_document():
 @permission_required('board')
 def view_pdf(doc_id):
     doc = Document.query.get_or_404(doc_id)
-    path = os.path.join(app.config['UPLOAD_PATH'], doc.filename)
-    return send_file(
-        path,
-        mimetype='application/pdf',
-        download_name=f'{doc.filename}.pdf',
-        as_attachment=False  # <-- makes it open inline
-    )
+    # Web-optimised copy unless ?original=1; supports Range, If-None-Match and proxy offload
+    original = request.args.get('original', type=int, default=0) == 1
+    return send_document(doc, download_name=f'{doc.filename}.pdf', original=original)
 
     # doc = Document.query.get_or_404(doc_id)
     # user_id = request.args.get('user_id')
@@ -453,23 +557,64 @@ def view_pdf(doc_id):
 @login_required
 @permission_required('board')
 def pending_documents():
-    users = User.query.all()  # Get all users
-    return render_template('pending_documents.html', users= users)
+    page = pending_documents_page(**pending_documents_args())
+    filters = {k: v for k, v in request.args.items() if k != 'cursor'}  # kept on the "next page" link
+    return render_template('pending_documents.html', documents=page.items, next_cursor=page.next_cursor, filters=filters)
+
+@app.route('/pending/documents/json', methods=['GET'])
+@login_required
+@permission_required('board')
+def pending_documents_json():
+    page = pending_documents_page(**pending_documents_args())
+    return jsonify(items=[document_to_dict(doc) for doc in page.items], next_cursor=page.next_cursor)
+
+@app.route('/documents/search', methods=['GET'])
+@login_required
+@permission_required('board')
+def search_documents_page():
+    q = request.args.get('q', '').strip()
+    page = search_documents(q, cursor=request.args.get('cursor'), limit=page_size(request.args.get('limit', type=int)))
+    return render_template('document_search.html', q=q, hits=page.items, next_cursor=page.next_cursor)
+
+@app.route('/documents/search/json', methods=['GET'])
+@login_required
+@permission_required('board')
+def search_documents_json():
+    page = search_documents(request.args.get('q', ''), cursor=request.args.get('cursor'), limit=page_size(request.args.get('limit', type=int)))
+    return jsonify(items=[hit_to_dict(hit) for hit in page.items], next_cursor=page.next_cursor)
+
+def pending_documents_args():
+    # Filters and cursor shared by the HTML and JSON document queues
+    return {
+        "cursor": request.args.get('cursor'),
+        "limit": page_size(request.args.get('limit', type=int)),
+        "doctype": request.args.get('doctype') or None,
+        "user_id": request.args.get('user_id', type=int),
+        "since": request.args.get('since', type=date.fromisoformat),
+        "until": request.args.get('until', type=date.fromisoformat),
+    }
 
 @app.route("/notification")
 @login_required
 @permission_required('board')
 def notification():
-    logs = (
-        ActivityLog.query
-        .order_by(ActivityLog.created_at.desc())
-        .limit(100)
-        .all()
-    )
-    return render_template("notification.html", logs=logs)
+    # Newest first; "Load older" follows the cursor of the last entry shown
+    filters = {
+        "action": request.args.get('action') or None,
+        "target_type": request.args.get('target_type') or None,
+        "actor_id": request.args.get('actor_id', type=int),
+    }
+    page = activity_feed_page(cursor=request.args.get('cursor'), **filters)
+    return render_template("notification.html",
+                           logs=page.items,
+                           targets=resolve_targets(page.items),
+                           next_cursor=page.next_cursor,
+                           filters={k: v for k, v in filters.items() if v},
+                           actions=ACTIONS,
+                           target_types=TARGET_TYPES)
 
-@login_required
 @app.route("/edit/profile", methods=["GET", "POST"])
+@login_required
 def edit_profile():
     form = EditProfile()  # Create form to edit profile
 
@@ -478,35 +623,45 @@ def edit_profile():
         changed_fields = {}
 
         if form.validate_on_submit():  # If form is valid
+            user = current_user_record()  # the full row, since columns change
             
-            if form.data['name'] and form.data['name'] != current_user.name:
+            if form.data['name'] and form.data['name'] != user.name:
                 changed_fields['name'] = form.data['name']
-                current_user.name = form.data['name']
+                user.name = form.data['name']
 
-            if form.data['email'] and form.data['email'] != current_user.email:
+            if form.data['email'] and form.data['email'] != user.email:
                 changed_fields['email'] = form.data['email']
-                current_user.email=form.data['email']
+                user.email=form.data['email']
 
-            if form.data['address'] and form.data['address'] != current_user.address:
+            if form.data['address'] and form.data['address'] != user.address:
                 changed_fields['address'] = form.data['address']
-                current_user.address=form.data['address']
+                user.address=form.data['address']
 
             if form.picture.data:
                 file = form.picture.data
-                filename = secure_filename(file.filename)
-                file.save(os.path.join(current_app.root_path, 'static/profile_pics', filename))
-                current_user.picture = filename
-                changed_fields['picture'] = filename
+                data = file.stream.read(app.config['MAX_AVATAR_BYTES'] + 1)
+                if len(data) > app.config['MAX_AVATAR_BYTES']:
+                    flash(f"Profile picture must be under {app.config['MAX_AVATAR_BYTES'] // (1024 * 1024)} MB")
+                    return redirect(url_for('edit_profile'))
+                try:
+                    picture = process_avatar(data)  # resized variants, stored under a content hash
+                except InvalidImage:
+                    flash("That file could not be read as an image")
+                    return redirect(url_for('edit_profile'))
+                if picture != user.picture:
+                    user.picture = picture
+                    changed_fields['picture'] = picture
 
             if changed_fields:  # Only log if something actually changed
                 log_event(
                     actor=current_user,
                     action="profile_updated",
                     target_type="User",
-                    target_id=current_user.id,
+                    target_id=user.id,
                     details=changed_fields
                 )
                 db.session.commit()
+                user_cache.invalidate(user.id)  # name/picture in the navbar
             
             return redirect(url_for('edit_profile'))
         else:
@@ -516,25 +671,37 @@ def edit_profile():
     # Return template on GET or if form fails validation
     return render_template("edit_profile.html", form = form)
 
+@app.route("/user/list")
 @login_required
 @permission_required('board')
-@app.route("/user/list")
 def user_list():
-    if request.args.get('filter_by') and request.args.get('search_query'):
-        filter_by = request.args.get('filter_by')
-        search_query = request.args.get('search_query')
-        
-        if filter_by == 'role':
-            # Filter by role
-            users = User.query.filter(User.role.ilike(f'%{search_query}%')).all()
-        elif filter_by == 'name':
-            # Filter by name
-            users = User.query.filter(User.name.ilike(f'%{search_query}%')).all()
-    else:
-        # No filter, show all users
-        users = User.query.all()    
-    
-    return render_template("user_list.html", users=users)
+    # Name/email words (prefix matched through the search index) and/or an exact role
+    query = request.args.get('q', '').strip()
+    role = request.args.get('role')
+    if role not in USER_ROLES:
+        role = None
+    page = search_users(
+        query,
+        role=role,
+        cursor=request.args.get('cursor'),
+        limit=page_size(request.args.get('limit', type=int))
+    )
+    return render_template("user_list.html", users=page.items, next_cursor=page.next_cursor,
+                           q=query, role=role, roles=USER_ROLES)
+
+@app.route("/users/search/json", methods=['GET'])
+@login_required
+@permission_required('board')
+def search_users_json():
+    # Typeahead for the user list and the specific-user task picker
+    role = request.args.get('role')
+    page = search_users(
+        request.args.get('q', ''),
+        role=role if role in USER_ROLES else None,
+        cursor=request.args.get('cursor'),
+        limit=page_size(request.args.get('limit', default=TYPEAHEAD_SIZE, type=int))
+    )
+    return jsonify(items=[user_to_dict(user) for user in page.items], next_cursor=page.next_cursor)
 
     
 # Registration route (handles user registration)
@@ -591,176 +758,6 @@ def logout():
     return redirect(url_for("user_dashboard"))
 
 
-@login_required
-@permission_required('volunteer')
-def generate_volunteer_certificate(user):
-    """
-    Generate a professional volunteer certificate PDF.
-    
-    What this does:
-    1. Creates a PDF in memory (BytesIO buffer)
-    2. Draws a professional certificate with borders
-    3. Fills in the volunteer's name, start date, and total hours
-    4. Returns the PDF buffer ready to send
-    
-    Args:
-        user: A User object from your database
-    
-    Returns:
-        BytesIO buffer containing the PDF data
-    """
-
-    # Create PDF in memory (not on disk!)
-    buffer = io.BytesIO()
-    pdf = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter  # 612 x 792 points (8.5" x 11")
-    
-    # ---------------------------
-    # OUTER BORDER
-    # ---------------------------
-    pdf.setStrokeColor(colors.HexColor('#2C3E50'))  # Dark blue-gray
-    pdf.setLineWidth(3)
-    pdf.rect(0.5 * inch, 0.5 * inch, width - 1*inch, height - 1*inch)
-    
-    # Inner decorative border
-    pdf.setLineWidth(1)
-    pdf.rect(0.6 * inch, 0.6 * inch, width - 1.2*inch, height - 1.2*inch)
-    
-    # ---------------------------
-    # HEADER SECTION WITH LOGO
-    # ---------------------------
-    y_pos = height - 1 * inch
-    
-    # Add logo image at the top - stretched nearly border to border
-    logo_path = os.path.join(app.root_path, 'static', 'neopte logo.jpeg')
-    if os.path.exists(logo_path):
-        # Logo dimensions - stretched almost to borders
-        logo_width = width - 1.4 * inch  # Stops just before the inner border
-        logo_height = 1.5 * inch  # Adjust height as needed
-        logo_x = 0.7 * inch  # Start just after the inner border
-        
-        pdf.drawImage(logo_path, logo_x, y_pos - logo_height, 
-                     width=logo_width, height=logo_height, 
-                     preserveAspectRatio=True, mask='auto')
-        
-        y_pos -= logo_height + 0.5 * inch
-    else:
-        # Fallback to text if logo not found
-        pdf.setFont("Helvetica-Bold", 28)
-        pdf.setFillColor(colors.HexColor('#2C3E50'))
-        title = "Neopte Foundation"
-        title_width = pdf.stringWidth(title, "Helvetica-Bold", 28)
-        pdf.drawString((width - title_width) / 2, y_pos, title)
-        y_pos -= 0.8 * inch
-    
-    # ---------------------------
-    # MAIN CONTENT - THE VOLUNTEER INFO
-    # ---------------------------
-    pdf.setFont("Helvetica", 14)
-    pdf.setFillColor(colors.black)
-    
-    # "This certifies that"
-    intro = "This certifies that"
-    intro_width = pdf.stringWidth(intro, "Helvetica", 14)
-    pdf.drawString((width - intro_width) / 2, y_pos, intro)
-    
-    y_pos -= 0.7 * inch
-    
-    # VOLUNTEER NAME - The star of the show!
-    pdf.setFont("Helvetica-Bold", 24)
-    pdf.setFillColor(colors.HexColor('#3498DB'))  # Blue
-    name_width = pdf.stringWidth(user.name, "Helvetica-Bold", 24)
-    pdf.drawString((width - name_width) / 2, y_pos, user.name)
-    
-    # Underline the name for emphasis
-    pdf.setStrokeColor(colors.HexColor('#3498DB'))
-    pdf.setLineWidth(1)
-    pdf.line((width - name_width) / 2 - 10, y_pos - 5, 
-             (width + name_width) / 2 + 10, y_pos - 5)
-    
-    y_pos -= 0.8 * inch
-    
-    # Service description with start date
-    pdf.setFont("Helvetica", 14)
-    pdf.setFillColor(colors.black)
-    
-    # Format the start date
-    
-    if user.date_created:
-        start_date = user.date_created.strftime('%B %d, %Y')
-        service_text = f"has been serving with the Neopte Foundation since {start_date}"
-    else:
-        service_text = "has been serving with the Neopte Foundation"
-    
-    service_width = pdf.stringWidth(service_text, "Helvetica", 14)
-    pdf.drawString((width - service_width) / 2, y_pos, service_text)
-    
-    y_pos -= 0.8 * inch
-    
-    # Hours intro
-    hours_intro = "contributing a total of"
-    hours_intro_width = pdf.stringWidth(hours_intro, "Helvetica", 14)
-    pdf.drawString((width - hours_intro_width) / 2, y_pos, hours_intro)
-    
-    y_pos -= 0.6 * inch
-    
-    # TOTAL HOURS - Big and bold!
-    pdf.setFont("Helvetica-Bold", 22)
-    pdf.setFillColor(colors.HexColor('#E74C3C'))  # Red for emphasis
-    hours_text = f"{user.total_hours:.1f} volunteer hours"
-    hours_width = pdf.stringWidth(hours_text, "Helvetica-Bold", 22)
-    pdf.drawString((width - hours_width) / 2, y_pos, hours_text)
-    
-    y_pos -= 1.5 * inch
-    
-    # ---------------------------
-    # FOOTER - Gratitude message
-    # ---------------------------
-    pdf.setFont("Helvetica-Oblique", 11)
-    pdf.setFillColor(colors.HexColor('#7F8C8D'))
-    gratitude = "We deeply appreciate your dedication and service to our community."
-    gratitude_width = pdf.stringWidth(gratitude, "Helvetica-Oblique", 11)
-    pdf.drawString((width - gratitude_width) / 2, y_pos, gratitude)
-    
-    y_pos -= 1 * inch
-    
-    # Signature line
-    pdf.setStrokeColor(colors.black)
-    pdf.setLineWidth(1)
-    sig_start = width / 2 - 2 * inch
-    pdf.line(sig_start, y_pos, sig_start + 4*inch, y_pos)
-    
-    y_pos -= 0.3 * inch
-    
-    # Signature label
-    pdf.setFont("Helvetica", 10)
-    pdf.setFillColor(colors.black)
-    sig_label = "Executive Director, Neopte Foundation"
-    sig_width = pdf.stringWidth(sig_label, "Helvetica", 10)
-    pdf.drawString((width - sig_width) / 2, y_pos, sig_label)
-    
-    # ---------------------------
-    # METADATA - Bottom of page
-    # ---------------------------
-    pdf.setFont("Helvetica", 8)
-    pdf.setFillColor(colors.HexColor('#BDC3C7'))  # Light gray
-    
-    # Certificate ID (bottom right)
-    cert_id = f"Certificate ID: NF-{user.id:05d}"
-    pdf.drawString(width - 2.5*inch, 0.7*inch, cert_id)
-    
-    # Issue date (bottom left)
-    issue_date = datetime.now().strftime('%B %d, %Y')
-    pdf.drawString(0.7*inch, 0.7*inch, f"Issued: {issue_date}")
-    
-    # Finalize the PDF
-    pdf.showPage()
-    pdf.save()
-    
-    # Reset buffer to beginning so it can be read
-    buffer.seek(0)
-    return buffer
-
 @app.route('/certificate/view')
 @login_required
 @permission_required('volunteer')
@@ -789,13 +786,9 @@ def view_certificate():
         # Volunteers/interns only see their own
         user = current_user
     
-    # Generate the PDF
-    pdf_buffer = generate_volunteer_certificate(user)
-    
-    # Send it to the browser (opens in new tab)
-    return send_file(
-        pdf_buffer,
-        mimetype='application/pdf',
+    # Send it to the browser (opens in new tab); the PDF is only built on a cache miss
+    return certificate_response(
+        user,
         as_attachment=False,  # False = open in browser
         download_name=f'neopte_certificate_{user.name.replace(" ", "_")}.pdf'
     )
@@ -821,17 +814,135 @@ def download_certificate():
     else:
         user = current_user
     
-    # Generate the PDF
-    pdf_buffer = generate_volunteer_certificate(user)
-    
     # Send it as a download
-    return send_file(
-        pdf_buffer,
-        mimetype='application/pdf',
+    return certificate_response(
+        user,
         as_attachment=True,  # True = force download
         download_name=f'neopte_volunteer_certificate_{user.name.replace(" ", "_")}.pdf'
     )
 
+@app.route('/certificate/bulk')
+@login_required
+@permission_required('board')
+def bulk_certificates():
+    """
+    Download every certificate at once as a ZIP.
+
+    - /certificate/bulk (everyone with approved hours)
+    - /certificate/bulk?role=volunteer (everyone with that role)
+    """
+    role = request.args.get('role') or None
+    users = certificate_export_users(role)
+    if not users:
+        flash("No users to export certificates for.")
+        return redirect(url_for(redirect_target.get(current_user.role)))
+
+    # The ZIP is streamed file by file as each PDF renders (in this process;
+    # the export-certificates command is the one that uses worker processes)
+    return Response(
+        certificate_zip_stream(users),
+        mimetype='application/zip',
+        headers={"Content-Disposition": f"attachment; filename=neopte_certificates_{role or 'all'}.zip"}
+    )
+
+@app.cli.command("reconcile-hours")
+@click.option("--fix", is_flag=True, help="Overwrite drifted totals with the sum of approved hours.")
+def reconcile_hours_command(fix):
+    """Compare every user's total_hours with their approved hours."""
+    drift = hours_drift()
+    for user_id, name, stored, actual in drift:
+        click.echo(f"{user_id:>6} {name:<30} stored {stored or 0:10.2f}  approved {actual:10.2f}")
+    if fix and drift:
+        fix_hours_drift([row.id for row in drift])
+        db.session.commit()
+        for row in drift:
+            certificate_cache.invalidate_user(row.id)
+    click.echo(f"{len(drift)} users drifted" + (", fixed" if fix and drift else ""))
+
+@app.cli.command("export-certificates")
+@click.option("--role", default=None, help="Only export users with this role (default: everyone with hours).")
+@click.option("--output", default="certificates.zip", show_default=True, help="ZIP file to write.")
+@click.option("--workers", default=None, type=int, help="Worker processes (default: one per CPU; 0 renders in this process).")
+def export_certificates_command(role, output, workers):
+    """Render certificates in bulk into a ZIP file."""
+    users = certificate_export_users(role)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    with open(output, "wb") as f:
+        for chunk in certificate_zip_stream(users, workers):
+            f.write(chunk)
+    click.echo(f"Wrote {len(users)} certificates to {output}")
+
+@app.route("/assets/<path:filename>")
+def asset(filename):
+    return send_asset(filename)
+
+@app.cli.command("build-assets")
+def build_assets_command():
+    """Fingerprint and precompress static files (run on every deploy)."""
+    manifest = write_manifest()
+    click.echo(f"Fingerprinted {len(manifest)} static files")
+
+@app.route("/avatars/<path:filename>")
+def avatar(filename):
+    # Names are content hashes, so a file never changes: cache it for good
+    response = send_from_directory(app.config['AVATAR_PATH'], filename, max_age=app.config['AVATAR_CACHE_MAX_AGE'])
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+@app.cli.command("process-avatars")
+def process_avatars_command():
+    """Build resized variants for the default picture and any pre-existing uploads."""
+    profile_pics = os.path.join(app.root_path, 'static', 'profile_pics')
+    with open(os.path.join(profile_pics, DEFAULT_PICTURE), "rb") as f:
+        process_avatar(f.read(), key=DEFAULT_KEY)
+
+    legacy = db.session.execute(
+        db.select(User.picture).where(User.picture.contains("."), User.picture != DEFAULT_PICTURE).distinct()
+    ).scalars().all()
+    for filename in legacy:
+        path = os.path.join(profile_pics, filename)
+        if not os.path.exists(path):
+            click.echo(f"Missing {filename}, left as is")
+            continue
+        with open(path, "rb") as f:
+            try:
+                picture = process_avatar(f.read())
+            except InvalidImage:
+                click.echo(f"Could not read {filename}, left as is")
+                continue
+        db.session.execute(db.update(User).where(User.picture == filename).values(picture=picture))
+    db.session.commit()
+    click.echo(f"Processed the default picture and {len(legacy)} uploaded pictures")
+
+@app.cli.command("index-documents")
+@click.option("--all", "reindex_all", is_flag=True, help="Re-extract every document, not just the missing ones.")
+def index_documents_command(reindex_all):
+    """Extract PDF text into the full text search index."""
+    if reindex_all:
+        doc_ids = db.session.execute(db.select(Document.id).order_by(Document.id)).scalars().all()
+    else:
+        doc_ids = unindexed_document_ids()
+    index_documents(doc_ids)
+    click.echo(f"Indexed {len(doc_ids)} documents")
+
+@app.cli.command("optimize-documents")
+@click.option("--all", "reoptimize_all", is_flag=True, help="Rebuild every web copy, not just the missing ones.")
+def optimize_documents_command(reoptimize_all):
+    """Build linearized web copies of uploaded PDFs."""
+    old_hashes = []
+    if reoptimize_all:
+        old_hashes = db.session.execute(db.select(Document.web_sha256).where(Document.web_sha256.isnot(None))).scalars().all()
+        db.session.execute(db.update(Document).values(web_sha256=None, web_size=None))
+        db.session.commit()
+    doc_ids = unoptimized_document_ids()
+    failed = optimize_documents(doc_ids)
+    release_blobs(old_hashes)  # web copies that weren't rebuilt identically
+    click.echo(f"Optimized {len(doc_ids) - len(failed)} documents")
+    if failed:
+        click.echo(f"Failed: {', '.join(map(str, failed))}")
+
 @app.route("/policies", methods=["GET"])
 @login_required
 @permission_required('volunteer')
@@ -855,7 +966,7 @@ def create_task():
                 description=form.data['description'],
                 classification=form.data['classification'],  # 'project' or 'reminder'
                 assigned_role=form.data['assigned_role'],    # 'intern', 'volunteer', 'board', or 'specific'
-                created_by=current_user
+                created_by=current_user_record()
             )
             db.session.add(task)
             db.session.commit()
@@ -896,57 +1007,42 @@ def create_task():
         
         form2 = CreateTaskAssignmentForm()
         
-        # Get users based on assigned_role
-        if assigned_role in ['intern', 'volunteer', 'board']:
-            # Get users with that specific role (for read-only display)
-            users = User.query.filter_by(role=assigned_role).all()
+        # Who will receive the task: a count and a short preview for whole roles,
+        # the picker choices for specific users
+        recipient_count, users = 0, []
+        if assigned_role in TASK_ROLES:
+            recipient_count, users = role_recipients(assigned_role)
         elif assigned_role == 'specific':
-            # Get ALL users for the multi-select dropdown
-            users = User.query.all()
-            # Populate the dropdown choices
-            form2.users_selected.choices = [(u.id, f"{u.name} ({u.email})") for u in users]
-        else:
-            users = []
+            # Users are picked through the search typeahead; only the ones
+            # already chosen (when the form is shown again) are loaded here
+            selected_ids = form2.users_selected.data or []
+            users = db.session.execute(
+                db.select(User.id, User.name, User.email).where(User.id.in_(selected_ids)).order_by(User.name)
+            ).all()
         
         if request.method == "POST" and form2.validate_on_submit():
             due_date = form2.data['due_date']
             upload_required = form2.data['upload_required']
             
-            if assigned_role in ['intern', 'volunteer', 'board']:
-                # Assign to ALL users with that role
-                users_to_assign = User.query.filter_by(role=assigned_role).all()
-                
-                for user in users_to_assign:
-                    assignment = TaskAssignment(
-                        task=task,
-                        user=user,
-                        due_date=due_date,
-                        upload=upload_required
-                    )
-                    db.session.add(assignment)
+            if assigned_role in TASK_ROLES:
+                # Assign to ALL users with that role, in one INSERT ... SELECT
+                assigned = assign_task(task, due_date, upload_required, actor=current_user)
             
             elif assigned_role == 'specific':
                 # Assign to SELECTED users only
-                user_ids = form2.users_selected.data
-                users_selected = User.query.filter(User.id.in_(user_ids)).all()
+                assigned = assign_task(task, due_date, upload_required, actor=current_user,
+                                       user_ids=form2.users_selected.data)
                 
-                if not users_selected:
+                if not assigned:
+                    db.session.rollback()
                     flash("Please select at least one user to assign the task to.")
                     return render_template("create_task.html", 
                                          form2=form2, 
                                          step=2, 
                                          task=task, 
                                          users=users,
+                                         recipient_count=recipient_count,
                                          assigned_role=assigned_role)
-                
-                for user in users_selected:
-                    assignment = TaskAssignment(
-                        task=task,
-                        user=user,
-                        due_date=due_date,
-                        upload=upload_required
-                    )
-                    db.session.add(assignment)
             
             db.session.commit()
             
@@ -962,6 +1058,7 @@ def create_task():
                              step=2, 
                              task=task, 
                              users=users,
+                             recipient_count=recipient_count,
                              assigned_role=assigned_role)
 
 # Optional: Route to cancel task creation and go back to step 1
@@ -984,59 +1081,26 @@ def cancel_task_creation():
     
     return redirect(url_for('create_task'))
 
-# Python route handler
-from datetime import datetime, timedelta
-
 @app.route("/tasks/status", methods=["GET"])
 @login_required
 @permission_required('volunteer')
 def task_status():
     if current_user.role in ['volunteer', 'intern']:
-        # Get task assignments for current user
-        assignments = TaskAssignment.query.filter_by(user_id=current_user.id).order_by(TaskAssignment.due_date.asc()).all()
-        
-        # Add helper properties to categorize tasks by date
-        today = datetime.now().date()
-        week_start = today - timedelta(days=today.weekday())
-        week_end = week_start + timedelta(days=6)
-        next_week_start = week_end + timedelta(days=1)
-        next_week_end = next_week_start + timedelta(days=6)
-        
-        for assignment in assignments:
-            due_date = assignment.due_date.date() if assignment.due_date else None
-            
-            if due_date:
-                if due_date < today and assignment.status != "done" and assignment.status != "graded":
-                    assignment.is_overdue = True
-                    assignment.is_this_week = False
-                    assignment.is_next_week = False
-                    assignment.is_later = False
-                elif week_start <= due_date <= week_end:
-                    assignment.is_this_week = True
-                    assignment.is_overdue = False
-                    assignment.is_next_week = False
-                    assignment.is_later = False
-                elif next_week_start <= due_date <= next_week_end:
-                    assignment.is_next_week = True
-                    assignment.is_this_week = False
-                    assignment.is_overdue = False
-                    assignment.is_later = False
-                else:
-                    assignment.is_later = True
-                    assignment.is_this_week = False
-                    assignment.is_next_week = False
-                    assignment.is_overdue = False
-            else:
-                assignment.is_later = True
-                assignment.is_this_week = False
-                assignment.is_next_week = False
-                assignment.is_overdue = False
-        
-        return render_template("task_status_list.html", assignments=assignments, role=current_user.role)
+        buckets = bucketed_assignments(current_user.id)
+        return render_template("task_status_list.html", buckets=buckets, role=current_user.role)
     
     else:  # board or admin
-        users = User.query.all()
-        return render_template("task_status_list.html", users=users, role=current_user.role)
+        # Everyone's task counts in one grouped query, a page at a time
+        sort = request.args.get('sort')
+        if sort not in OVERVIEW_SORTS:
+            sort = 'name'
+        page = task_overview_page(
+            cursor=request.args.get('cursor'),
+            limit=page_size(request.args.get('limit', type=int)),
+            sort=sort
+        )
+        return render_template("task_status_list.html", users=page.items, next_cursor=page.next_cursor,
+                               sort=sort, role=current_user.role)
 
 
 @app.route("/tasks/user", methods=["GET"])
@@ -1049,46 +1113,9 @@ def specific_user_tasks():
         return redirect(url_for('task_status'))
     
     user = User.query.get_or_404(user_id)
-    assignments = TaskAssignment.query.filter_by(user_id=user_id).order_by(TaskAssignment.due_date.asc()).all()
-    
-    # Add helper properties to categorize tasks by date
-    today = datetime.now().date()
-    week_start = today - timedelta(days=today.weekday())
-    week_end = week_start + timedelta(days=6)
-    next_week_start = week_end + timedelta(days=1)
-    next_week_end = next_week_start + timedelta(days=6)
-    
-    for assignment in assignments:
-        due_date = assignment.due_date.date() if assignment.due_date else None
-        
-        if due_date:
-            if due_date < today and assignment.status != "done" and assignment.status != "graded":
-                assignment.is_overdue = True
-                assignment.is_this_week = False
-                assignment.is_next_week = False
-                assignment.is_later = False
-            elif week_start <= due_date <= week_end:
-                assignment.is_this_week = True
-                assignment.is_overdue = False
-                assignment.is_next_week = False
-                assignment.is_later = False
-            elif next_week_start <= due_date <= next_week_end:
-                assignment.is_next_week = True
-                assignment.is_this_week = False
-                assignment.is_overdue = False
-                assignment.is_later = False
-            else:
-                assignment.is_later = True
-                assignment.is_this_week = False
-                assignment.is_next_week = False
-                assignment.is_overdue = False
-        else:
-            assignment.is_later = True
-            assignment.is_this_week = False
-            assignment.is_next_week = False
-            assignment.is_overdue = False
+    buckets = bucketed_assignments(user_id)
     
-    return render_template("specific_user_tasks.html", user=user, assignments=assignments)
+    return render_template("specific_user_tasks.html", user=user, buckets=buckets)
 
 
 
@@ -0,0 +1,55 @@
+"""
+Certificate rendering benchmark.
+
+Renders the same certificate with the classic full redraw and with the
+prebuilt CertificateTemplate, and prints per-certificate time and PDF size.
+
+Usage:
+    python benchmarks/certificates.py [--count 200]
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from project import certificates
+from project.certificates import CertificateTemplate, generate_volunteer_certificate
+
+
+def measure(label, count, template):
+    user = SimpleNamespace(id=42, name="Jordan Example", total_hours=123.5, date_created=datetime(2024, 5, 1))
+    size = len(generate_volunteer_certificate(user, template=template).getvalue())
+
+    t0 = time.perf_counter()
+    for _ in range(count):
+        generate_volunteer_certificate(user, template=template)
+    per_cert = (time.perf_counter() - t0) / count * 1000
+
+    print(f"{label:<10} {per_cert:8.2f} ms/certificate   {size / 1024:7.1f} KiB")
+    return per_cert, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=200)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    template = CertificateTemplate()
+    print(f"template built once in {(time.perf_counter() - t0) * 1000:.2f} ms")
+
+    # Disable the app-wide template so the classic path really redraws everything
+    certificates.certificate_template = None
+    classic_time, classic_size = measure("classic", args.count, None)
+    template_time, template_size = measure("template", args.count, template)
+
+    print(f"\n{classic_time / template_time:.1f}x faster, "
+          f"{100 * (1 - template_size / classic_size):.0f}% smaller")
+
+
+if __name__ == "__main__":
+    main()
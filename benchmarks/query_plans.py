@@ -0,0 +1,151 @@
+"""
+Query plan benchmark for the hot board/volunteer queries.
+
+Seeds a throwaway SQLite database with the real schema and a large amount
+of fake data, then prints EXPLAIN QUERY PLAN and average timings for each
+query twice: once without the secondary indexes and once with them.
+A "SCAN" on a big table in the "after" section means an index regressed.
+
+Usage:
+    python benchmarks/query_plans.py [--users 10000] [--rows 200000] [--repeat 20]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlalchemy as sa
+from project.models import db  # importing the models registers their tables on db.metadata
+
+
+# The queries the app runs on its busiest pages, with sample parameters
+HOT_QUERIES = {
+    "pending hours queue": (
+        "SELECT hours.*, users.name FROM hours JOIN users ON users.id = hours.fk_hours_user_id "
+        "WHERE hours.status = 'Pending' ORDER BY hours.date, hours.id LIMIT 51",
+        (),
+    ),
+    "pending documents queue": (
+        "SELECT documents.*, users.name FROM documents JOIN users ON users.id = documents.fk_documents_user_id "
+        "WHERE documents.status = 'Pending' ORDER BY documents.uploaded_at, documents.id LIMIT 51",
+        (),
+    ),
+    "one user's hours": (
+        "SELECT * FROM hours WHERE fk_hours_user_id = ? AND status = 'Approved'",
+        (42,),
+    ),
+    "notification feed": (
+        "SELECT * FROM activity_logs ORDER BY created_at DESC, id DESC LIMIT 101",
+        (),
+    ),
+    "tasks for user": (
+        "SELECT * FROM task_assignments WHERE fk_taskassign_user_id = ? ORDER BY due_date",
+        (42,),
+    ),
+    "users by role": (
+        "SELECT id FROM users WHERE role = ?",
+        ("intern",),
+    ),
+}
+
+ROLES = ["user", "intern", "volunteer", "board"]
+STATUSES = ["Approved"] * 8 + ["Denied", "Pending"]
+
+
+def seed(path, users, rows):
+    engine = sa.create_engine(f"sqlite:///{path}")
+    db.metadata.create_all(engine)
+    engine.dispose()
+
+    con = sqlite3.connect(path)
+    rnd = random.Random(1)
+    start = datetime(2020, 1, 1)
+
+    con.executemany(
+        "INSERT INTO users (id, name, email, address, password_hash, date_created, total_hours, picture, role) "
+        "VALUES (?, ?, ?, '', '', ?, 0, 'default.jpeg', ?)",
+        ((i, f"User{i}", f"user{i}@example.com", start, rnd.choice(ROLES)) for i in range(1, users + 1)),
+    )
+    con.executemany(
+        "INSERT INTO hours (activity_name, date, start_time, end_time, amount, description, status, fk_hours_user_id) "
+        "VALUES ('event', ?, '09:00:00', '11:00:00', 2, '', ?, ?)",
+        ((date(2020, 1, 1) + timedelta(days=rnd.randrange(2000)), rnd.choice(STATUSES), rnd.randint(1, users))
+         for _ in range(rows)),
+    )
+    con.executemany(
+        "INSERT INTO documents (filename, doctype, status, description, uploaded_at, fk_documents_user_id) "
+        "VALUES ('file.pdf', 'application/pdf', ?, '', ?, ?)",
+        ((rnd.choice(STATUSES), (start + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"), rnd.randint(1, users))
+         for i in range(rows // 2)),
+    )
+    con.executemany(
+        "INSERT INTO activity_logs (actor_id, action, target_type, target_id, created_at) "
+        "VALUES (?, 'hours_status_changed', 'Hours', ?, ?)",
+        ((rnd.randint(1, users), i, (start + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"))
+         for i in range(rows)),
+    )
+    con.execute(
+        "INSERT INTO tasks (id, classification, title, description, created_at) "
+        "VALUES (1, 'project', 'Benchmark task', '', CURRENT_TIMESTAMP)"
+    )
+    con.executemany(
+        "INSERT INTO task_assignments (fk_taskassign_task_id, fk_taskassign_user_id, due_date, status, upload, comments) "
+        "VALUES (1, ?, ?, 'pending', 0, '')",
+        ((rnd.randint(1, users), (start + timedelta(days=rnd.randrange(2000))).strftime("%Y-%m-%d %H:%M:%S"))
+         for _ in range(rows // 2)),
+    )
+    con.commit()
+    return con
+
+
+def secondary_indexes():
+    return [index for table in db.metadata.sorted_tables for index in table.indexes]
+
+
+def run(con, label, repeat):
+    print(f"\n=== {label} ===")
+    for name, (sql, params) in HOT_QUERIES.items():
+        plan = con.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            con.execute(sql, params).fetchall()
+        elapsed = (time.perf_counter() - t0) / repeat * 1000
+        print(f"{name:<26} {elapsed:9.3f} ms")
+        for row in plan:
+            print(f"    {row[-1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        con = seed(path, args.users, args.rows)
+        print(f"Seeded {args.users} users and {args.rows} hours/activity rows into {path}")
+
+        for index in secondary_indexes():
+            con.execute(f"DROP INDEX IF EXISTS {index.name}")
+        con.execute("ANALYZE")
+        run(con, "before (primary keys only)", args.repeat)
+
+        engine = sa.create_engine(f"sqlite:///{path}")
+        for index in secondary_indexes():
+            index.create(engine)
+        engine.dispose()
+        con.execute("ANALYZE")
+        run(con, "after (with indexes)", args.repeat)
+        con.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Role-wide task assignment benchmark.
+
+Seeds a throwaway SQLite database with N users in one role and assigns a
+task to all of them twice: the old way (load every User, add one
+TaskAssignment object each) and with the single INSERT ... SELECT that
+create_task() now uses. Prints time and peak Python memory for each.
+
+Usage:
+    python benchmarks/task_fanout.py [--users 10000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+from project import db
+from project.models import Task, TaskAssignment, User
+from project.tasks import fan_out_statement
+
+ROLE = "volunteer"
+
+
+def seed(engine, users):
+    db.metadata.create_all(engine)
+    with engine.begin() as con:
+        con.execute(
+            User.__table__.insert(),
+            [{"id": i, "name": f"User{i}", "email": f"user{i}@example.com", "address": "",
+              "password_hash": "", "date_created": datetime(2024, 1, 1), "total_hours": 0,
+              "picture": "default.jpeg", "role": ROLE} for i in range(1, users + 1)],
+        )
+
+
+def new_task(session, title):
+    task = Task(title=title, description="", classification="project", assigned_role=ROLE, created_by=None)
+    session.add(task)
+    session.commit()
+    return task
+
+
+def orm_per_user(session, due_date):
+    task = new_task(session, "orm")
+    for user in session.query(User).filter_by(role=ROLE).all():
+        session.add(TaskAssignment(task=task, user=user, due_date=due_date, upload=False))
+    session.commit()
+
+
+def insert_select(session, due_date):
+    task = new_task(session, "insert-select")
+    session.execute(fan_out_statement(task.id, sa.select(User.id).where(User.role == ROLE), due_date, False))
+    session.commit()
+
+
+def measure(label, fn, engine, due_date):
+    with Session(engine) as session:
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        fn(session, due_date)
+        elapsed = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    print(f"{label:<16} {elapsed * 1000:9.1f} ms   peak {peak / 1024 / 1024:7.1f} MiB")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = sa.create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        seed(engine, args.users)
+        print(f"Assigning one task to {args.users} users")
+        due_date = datetime(2030, 1, 1)
+        old = measure("ORM per user", orm_per_user, engine, due_date)
+        new = measure("INSERT ... SELECT", insert_select, engine, due_date)
+
+        with engine.connect() as con:
+            counts = con.execute(sa.text(
+                "SELECT fk_taskassign_task_id, count(*) FROM task_assignments GROUP BY 1 ORDER BY 1"
+            )).all()
+        assert all(count == args.users for _, count in counts), counts
+        print(f"\n{old / new:.0f}x faster")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+User list benchmark.
+
+Seeds a throwaway SQLite database with N users and builds the board's user
+table three ways: full User objects for everyone (the old User.query.all()),
+UserRow projections for everyone, and the one page of UserRows the list
+pages now load. Prints query + render time and peak Python memory for each.
+
+Usage:
+    python benchmarks/user_rows.py [--users 10000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlalchemy as sa
+from jinja2 import Template
+from sqlalchemy.orm import Session
+from project import db
+from project.models import User
+from project.pagination import PAGE_SIZE
+from project.users import UserRow, USER_ROW_COLUMNS
+
+TABLE = Template(
+    "{% for user in users %}<tr><td>{{ user.name }}</td><td>{{ user.id }}</td>"
+    "<td>{{ user.role }}</td></tr>{% endfor %}"
+)
+
+
+def seed(engine, users):
+    db.metadata.create_all(engine)
+    with engine.begin() as con:
+        con.execute(
+            User.__table__.insert(),
+            [{"id": i, "name": f"User{i}", "email": f"user{i}@example.com", "address": "1 Long Street, Springfield",
+              "password_hash": "x" * 102, "date_created": datetime(2024, 1, 1), "total_hours": 0,
+              "picture": "default.jpeg", "role": "volunteer"} for i in range(1, users + 1)],
+        )
+
+
+def orm_objects(session):
+    return session.query(User).all()
+
+
+def projected_all(session):
+    return [UserRow._make(row) for row in session.execute(sa.select(*USER_ROW_COLUMNS).order_by(User.name, User.id))]
+
+
+def projected_page(session):
+    statement = sa.select(*USER_ROW_COLUMNS).order_by(User.name, User.id).limit(PAGE_SIZE + 1)
+    return [UserRow._make(row) for row in session.execute(statement)][:PAGE_SIZE]
+
+
+def measure(label, fn, engine):
+    with Session(engine) as session:
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        html = TABLE.render(users=fn(session))
+        elapsed = time.perf_counter() - t0
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    print(f"{label:<20} {elapsed * 1000:9.1f} ms   peak {peak / 1024 / 1024:7.1f} MiB   {len(html) // 1024:6d} KiB html")
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = sa.create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        seed(engine, args.users)
+        print(f"Listing {args.users} users")
+        old_time, old_peak = measure("User objects", orm_objects, engine)
+        all_time, all_peak = measure("UserRows, all", projected_all, engine)
+        new_time, new_peak = measure(f"UserRows, page {PAGE_SIZE}", projected_page, engine)
+        print(f"\nall rows: {old_time / all_time:.1f}x faster, {old_peak / all_peak:.1f}x less memory")
+        print(f"one page: {old_time / new_time:.0f}x faster, {old_peak / new_peak:.0f}x less memory")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
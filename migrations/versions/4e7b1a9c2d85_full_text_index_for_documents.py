@@ -0,0 +1,30 @@
+"""full text index for documents
+
+Revision ID: 4e7b1a9c2d85
+Revises: c3a91f5e0d68
+Create Date: 2026-10-18 16:02:47.118204
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4e7b1a9c2d85'
+down_revision = 'c3a91f5e0d68'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # FTS5 virtual table keyed by documents.id (rowid); filled by `flask index-documents`
+    op.execute(
+        "CREATE VIRTUAL TABLE document_text USING fts5("
+        "filename, description, body, "
+        "tokenize = 'porter unicode61 remove_diacritics 2')"
+    )
+    # Default ranking for ORDER BY rank: filename and description matches count most
+    op.execute("INSERT INTO document_text (document_text, rank) VALUES ('rank', 'bm25(10.0, 4.0, 1.0)')")
+
+
+def downgrade():
+    op.execute("DROP TABLE document_text")
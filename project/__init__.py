@@ -8,8 +8,8 @@ from flask_login import LoginManager
 # Initialize the Flask application
 app = Flask(__name__, static_folder='static', template_folder='templates')
 
-# Set up configuration for SQLAlchemy and secret key
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///project.db"
+# Set up configuration for SQLAlchemy and secret key (DATABASE_URL overrides the database, e.g. for the tests)
+app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///project.db")
 app.config['SECRET_KEY'] = 'mysecretkey'
 
 # Configure the upload folder for file uploads
@@ -17,8 +17,53 @@ UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), 'uploads')
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
 app.config['UPLOAD_PATH'] = UPLOAD_FOLDER
+# Uploaded files are stored once per distinct content, named by their SHA-256
+app.config['BLOB_PATH'] = os.path.join(UPLOAD_FOLDER, 'blobs')
+# Blobs never change, so browsers may keep their (private) copy for a year
+app.config['DOCUMENT_CACHE_MAX_AGE'] = 365 * 24 * 60 * 60
+# Let the front proxy send document bytes instead of the Python worker:
+# X_ACCEL_REDIRECT_PREFIX for nginx (an internal location aliased to UPLOAD_PATH),
+# USE_X_SENDFILE for Apache/lighttpd
+app.config['X_ACCEL_REDIRECT_PREFIX'] = os.environ.get('X_ACCEL_REDIRECT_PREFIX')
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE') == '1'
 ALLOWED_EXTENSIONS = {'pdf'} #'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif'
 app.config['UPLOAD_EXTENSIONS'] = ALLOWED_EXTENSIONS
+app.config['MAX_UPLOAD_BYTES'] = 25 * 1024 * 1024  # per file
+app.config['MAX_CONTENT_LENGTH'] = 200 * 1024 * 1024  # whole request, rejected with 413 before parsing
+# Text pulled out of each PDF for full text search (see project/search.py)
+app.config['MAX_INDEXED_CHARS'] = 1_000_000
+# Post-process uploads (web-optimised copy, search text) on a background thread
+app.config['UPLOADS_IN_BACKGROUND'] = True
+# view_pdf serves a linearized copy of each PDF so the first page shows before the
+# whole file arrives; optionally re-encode big images as JPEG at this quality
+app.config['PDF_RECOMPRESS_IMAGES'] = os.environ.get('PDF_RECOMPRESS_IMAGES') == '1'
+app.config['PDF_IMAGE_QUALITY'] = 75
+
+# Resized, metadata-free profile pictures (see project/avatars.py), cached for a year
+app.config['AVATAR_PATH'] = os.path.join(os.path.dirname(__file__), 'static', 'avatars')
+app.config['MAX_AVATAR_BYTES'] = 10 * 1024 * 1024
+app.config['AVATAR_CACHE_MAX_AGE'] = 365 * 24 * 60 * 60
+
+# Static files are referenced by fingerprinted name (asset_url), so they can be cached for a year
+app.config['ASSET_CACHE_MAX_AGE'] = 365 * 24 * 60 * 60
+# Compress dynamic text responses bigger than this many bytes (gzip, or brotli if installed)
+app.config['COMPRESS_MIN_SIZE'] = 1024
+app.config['COMPRESS_MIMETYPES'] = {'text/html', 'application/json', 'text/css', 'text/plain', 'text/csv', 'application/javascript'}
+
+# Rendered volunteer certificates are cached in memory (per worker) and,
+# if CERTIFICATE_CACHE_DIR is set, on disk so every worker can share them
+app.config['CERTIFICATE_CACHE_BYTES'] = 32 * 1024 * 1024
+app.config['CERTIFICATE_CACHE_DIR'] = os.environ.get('CERTIFICATE_CACHE_DIR')
+# Render the unchanging parts of the certificate once at startup and only stamp the per-volunteer fields
+app.config['CERTIFICATE_TEMPLATE'] = True
+
+# Optionally cache signed-in users' id/name/role/picture per worker for this
+# many seconds (default 0: load the User on every request). Role changes apply
+# at once only for workers sharing USER_CACHE_DIR, i.e. a single host (or a
+# shared volume); on a multi-host deploy other hosts can keep a demoted or
+# deleted user's old role for up to USER_CACHE_TTL seconds.
+app.config['USER_CACHE_TTL'] = int(os.environ.get('USER_CACHE_TTL', 0))
+app.config['USER_CACHE_DIR'] = os.environ.get('USER_CACHE_DIR') or os.path.join(app.instance_path, 'user_versions')
 
 
 # Define a custom base class for SQLAlchemy models
@@ -1,6 +1,32 @@
 from flask_login import current_user
+from sqlalchemy.orm import selectinload
 from project import db
-from project.models import ActivityLog
+from project.models import ActivityLog, Document, Hours, Task, User
+from project.pagination import keyset_paginate
+
+# Values used by the notification feed filters
+ACTIONS = [
+    "document_status_changed",
+    "document_uploaded",
+    "hours_created",
+    "hours_status_changed",
+    "profile_updated",
+    "task_assigned",
+    "task_created",
+    "user_deleted",
+    "user_role_changed",
+]
+TARGET_TYPES = ["Document", "Hours", "Task", "User"]
+
+# Model behind each target_type, used to look targets up in bulk
+TARGET_MODELS = {
+    "Document": Document,
+    "Hours": Hours,
+    "Task": Task,
+    "User": User,
+}
+
+FEED_PAGE_SIZE = 100
 
 def log_event(
     *,
@@ -26,4 +52,82 @@ def log_event(
         details=details
     )
 
-    db.session.add(event)
\ No newline at end of file
+    db.session.add(event)
+
+def log_events(events, *, actor=None):
+    """
+    Records many events with a single INSERT. `events` are dicts with
+    action, target_type, target_id and optionally details.
+    Does NOT commit — caller controls the transaction.
+    """
+
+    if actor is None:
+        actor = current_user
+
+    rows = [
+        {
+            "actor_id": actor.id,
+            "action": event["action"],
+            "target_type": event["target_type"],
+            "target_id": event["target_id"],
+            "details": event.get("details"),
+        }
+        for event in events
+    ]
+    if rows:
+        db.session.execute(db.insert(ActivityLog), rows)
+
+def activity_feed_page(
+    *,
+    cursor: str | None = None,
+    limit: int = FEED_PAGE_SIZE,
+    action: str | None = None,
+    target_type: str | None = None,
+    actor_id: int | None = None
+):
+    """
+    Newest-first page of the activity log.
+    Pages by (created_at, id) so "load older" stays an index seek at any
+    depth, and loads every actor on the page with one extra IN query.
+    """
+
+    query = db.select(ActivityLog).options(selectinload(ActivityLog.actor))
+
+    if action:
+        query = query.where(ActivityLog.action == action)
+    if target_type:
+        query = query.where(ActivityLog.target_type == target_type)
+    if actor_id:
+        query = query.where(ActivityLog.actor_id == actor_id)
+
+    return keyset_paginate(
+        query,
+        columns=[ActivityLog.created_at, ActivityLog.id],
+        key=lambda log: (log.created_at, log.id),
+        cursor=cursor,
+        limit=limit,
+        descending=True
+    )
+
+def resolve_targets(logs):
+    """
+    Looks up the object each log entry points at.
+    Groups the entries by target_type and fetches every target of a type with
+    one IN query, so a page costs at most one query per type.
+
+    Returns {(target_type, target_id): object}. Targets that have since been
+    deleted (or whose type is unknown) are simply missing from the dict.
+    """
+
+    ids_by_type = {}
+    for log in logs:
+        if log.target_type in TARGET_MODELS:
+            ids_by_type.setdefault(log.target_type, set()).add(log.target_id)
+
+    targets = {}
+    for target_type, ids in ids_by_type.items():
+        model = TARGET_MODELS[target_type]
+        for obj in db.session.scalars(db.select(model).where(model.id.in_(ids))):
+            targets[(target_type, obj.id)] = obj
+
+    return targets
@@ -0,0 +1,161 @@
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+
+from flask import abort, request, send_file, url_for
+from project import app
+
+try:
+    import brotli
+except ImportError:  # optional: without it only gzip copies are made
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Written by `flask build-assets`; maps "css/site.css" -> "css/site.1a2b3c4d5e.css"
+MANIFEST_NAME = "manifest.json"
+# Already content-addressed, or not ours to fingerprint
+SKIP_DIRS = {"avatars"}
+COMPRESSIBLE = {".css", ".js", ".svg", ".json", ".txt", ".html", ".map"}
+# Precompressed copies live next to the original, e.g. css/site.css.br
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+_manifest = {}   # original name -> fingerprinted name
+_originals = {}  # fingerprinted name -> original name
+_stamps = {}     # original name -> mtime_ns of the file when it was hashed
+
+
+def _fingerprint(name, digest):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{digest[:10]}{ext}"
+
+
+def _static_files(root):
+    for directory, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith(".")]
+        for filename in files:
+            if filename.startswith(".") or filename == MANIFEST_NAME or filename.endswith((".gz", ".br")):
+                continue
+            path = os.path.join(directory, filename)
+            yield os.path.relpath(path, root).replace(os.sep, "/"), path
+
+
+def build_manifest(compress=False):
+    """
+    Hashes every static file (and with compress=True writes .gz/.br copies of
+    the text ones, at maximum compression since it happens once per deploy).
+    Returns the manifest.
+    """
+    manifest = {}
+    for name, path in _static_files(app.static_folder):
+        with open(path, "rb") as f:
+            data = f.read()
+        manifest[name] = _fingerprint(name, hashlib.sha256(data).hexdigest())
+        if compress and os.path.splitext(name)[1] in COMPRESSIBLE:
+            with open(path + ".gz", "wb") as out:
+                out.write(gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                with open(path + ".br", "wb") as out:
+                    out.write(brotli.compress(data, quality=11))
+    return manifest
+
+
+def load_manifest():
+    """
+    Fingerprints the static folder from the files as they are now, so a name
+    can never point at different bytes. A manifest.json left by an earlier
+    `flask build-assets` is only compared against it, to warn that the
+    precompressed copies are out of date.
+    """
+    # stat before hashing: a file edited in between then just gets re-hashed on request
+    stamps = {name: os.stat(path).st_mtime_ns for name, path in _static_files(app.static_folder)}
+    manifest = build_manifest()
+    path = os.path.join(app.static_folder, MANIFEST_NAME)
+    if os.path.exists(path):
+        with open(path) as f:
+            built = json.load(f)
+        stale = sorted(name for name, hashed in manifest.items() if built.get(name) != hashed)
+        if stale:
+            logger.warning("Static files changed since `flask build-assets`: %s", ", ".join(stale))
+    _manifest.clear()
+    _manifest.update(manifest)
+    _originals.clear()
+    _originals.update({hashed: name for name, hashed in manifest.items()})
+    _stamps.clear()
+    _stamps.update(stamps)
+
+
+def _unchanged(original, filename, path):
+    # Re-hash only when the file was touched after startup
+    mtime = os.stat(path).st_mtime_ns
+    if mtime == _stamps.get(original):
+        return True
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    if _fingerprint(original, digest) != filename:
+        return False
+    _stamps[original] = mtime
+    return True
+
+
+def write_manifest():
+    manifest = build_manifest(compress=True)
+    with open(os.path.join(app.static_folder, MANIFEST_NAME), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    load_manifest()
+    return manifest
+
+
+@app.template_global()
+def asset_url(endpoint, filename, **values):
+    """
+    Drop-in for url_for('static', filename=...): points at the fingerprinted
+    copy so it can be cached forever, and a changed file gets a new URL.
+    In debug mode, and for files added after startup, it is plain url_for.
+    """
+    hashed = _manifest.get(filename)
+    if endpoint != "static" or hashed is None or app.debug:
+        return url_for(endpoint, filename=filename, **values)
+    return url_for("asset", filename=hashed, **values)
+
+
+def send_asset(filename):
+    """
+    Serves a fingerprinted static file: the precompressed copy matching
+    Accept-Encoding if one was built, cached publicly for good (the name
+    changes whenever the content does).
+    """
+    original = _originals.get(filename)
+    if original is None:
+        abort(404)
+    path = os.path.join(app.static_folder, original)
+    # Never serve other bytes under an immutable name (file edited since startup)
+    if not os.path.exists(path) or not _unchanged(original, filename, path):
+        abort(404)
+    mimetype = mimetypes.guess_type(original)[0] or "application/octet-stream"
+
+    # Pick the best precompressed copy the client accepts
+    encoding = None
+    for name, suffix in ENCODINGS:
+        compressed = path + suffix
+        # ignore copies older than the file (edited since the last build-assets)
+        if request.accept_encodings[name] and os.path.exists(compressed) \
+                and os.path.getmtime(compressed) >= os.path.getmtime(path):
+            encoding, path = name, compressed
+            break
+
+    etag = f"{filename}.{encoding}" if encoding else filename  # each encoding is its own representation
+    response = send_file(path, mimetype=mimetype, max_age=app.config['ASSET_CACHE_MAX_AGE'], etag=etag)
+    if encoding:
+        response.content_encoding = encoding
+    if os.path.splitext(original)[1] in COMPRESSIBLE:
+        response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+load_manifest()
@@ -0,0 +1,88 @@
+import hashlib
+import io
+import os
+import tempfile
+
+from flask import url_for
+from PIL import Image, ImageOps, UnidentifiedImageError
+from project import app
+
+# Square sizes (px) every profile picture is rendered at: lists use the
+# thumbnail, the profile page the medium one. Both cover 2x screens.
+AVATAR_VARIANTS = {"thumb": 96, "medium": 384}
+AVATAR_FORMAT, AVATAR_EXTENSION, AVATAR_QUALITY = "WEBP", "webp", 80
+
+# What new users get; its variants ship in static/avatars (see `flask process-avatars`)
+DEFAULT_PICTURE = "default.jpeg"
+DEFAULT_KEY = "default"
+
+# Refuse images that would take a lot of memory to decode, whatever their file size
+MAX_AVATAR_PIXELS = 40_000_000
+
+
+class InvalidImage(Exception):
+    pass
+
+
+def _write_atomic(path, data):
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".avatar-", suffix=".part")
+    with os.fdopen(fd, "wb") as out:
+        out.write(data)
+    os.chmod(temp_path, 0o644)  # mkstemp makes it owner-only; static files must be readable by the web server
+    os.replace(temp_path, path)
+
+
+def avatar_filename(key, variant):
+    return f"{key}-{variant}.{AVATAR_EXTENSION}"
+
+
+def process_avatar(data, key=None):
+    """
+    Decodes an uploaded picture once and writes every AVATAR_VARIANTS size
+    as WebP, with EXIF/ICC/comments dropped (orientation is applied first).
+    Files are named after the SHA-256 of the upload, so the same picture is
+    only stored once and a name never points at different pixels.
+    Returns the key to store in User.picture. Raises InvalidImage.
+    """
+    key = key or hashlib.sha256(data).hexdigest()[:32]
+    directory = app.config['AVATAR_PATH']
+    os.makedirs(directory, exist_ok=True)
+    paths = {variant: os.path.join(directory, avatar_filename(key, variant)) for variant in AVATAR_VARIANTS}
+    if all(os.path.exists(path) for path in paths.values()):
+        return key
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        if image.width * image.height > MAX_AVATAR_PIXELS:
+            raise InvalidImage("Image is too large")
+        # Let JPEG decode at a reduced scale when the photo is much bigger than we need
+        largest = max(AVATAR_VARIANTS.values())
+        image.draft("RGB", (largest * 2, largest * 2))
+        image = ImageOps.exif_transpose(image)  # also first frame only for GIFs
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise InvalidImage(str(e)) from e
+
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+    image.info = {}  # nothing from the original file survives into the variants
+
+    for variant, size in AVATAR_VARIANTS.items():
+        resized = ImageOps.fit(image, (size, size), Image.LANCZOS)
+        buffer = io.BytesIO()
+        resized.save(buffer, AVATAR_FORMAT, quality=AVATAR_QUALITY, method=6)
+        _write_atomic(paths[variant], buffer.getvalue())
+    return key
+
+
+@app.template_global()
+def avatar_url(picture, variant="thumb"):
+    """
+    URL of a user's profile picture at one of the AVATAR_VARIANTS sizes.
+    Pictures uploaded before variants existed are still plain files in
+    static/profile_pics and are served as they are.
+    """
+    if picture == DEFAULT_PICTURE:
+        picture = DEFAULT_KEY
+    if "." in picture:
+        return url_for('static', filename='profile_pics/' + picture)
+    return url_for('avatar', filename=avatar_filename(picture, variant))
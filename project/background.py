@@ -0,0 +1,32 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from project import app
+
+logger = logging.getLogger(__name__)
+
+# Upload post-processing (PDF optimisation, text extraction) runs here, off the
+# request. One worker keeps jobs in submission order, and SQLite only takes one
+# writer anyway.
+_worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="upload-worker")
+
+
+def _run(job, args):
+    with app.app_context():
+        try:
+            job(*args)
+        except Exception:
+            logger.exception("Background job %s%r failed", job.__name__, args)
+
+
+def run_later(job, *args):
+    """
+    Runs `job(*args)` on the background worker inside an app context, or
+    straight away when UPLOADS_IN_BACKGROUND is off (handy for scripts).
+    Jobs must be safe to re-run: a restart can drop queued work, which the
+    matching backfill command picks up.
+    """
+    if app.config['UPLOADS_IN_BACKGROUND']:
+        _worker.submit(_run, job, args)
+    else:
+        job(*args)
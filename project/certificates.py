@@ -0,0 +1,472 @@
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import threading
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from types import SimpleNamespace
+
+from flask import request, send_file
+from pypdf import PdfReader, PdfWriter
+from werkzeug.utils import secure_filename
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+from project import app, db
+from project.models import User
+
+logger = logging.getLogger(__name__)
+
+
+class CertificateCache:
+    """
+    LRU cache of rendered certificate PDFs.
+
+    Entries live in memory up to `max_bytes`; if `disk_dir` is set, they are
+    also written there so other workers (and restarts) can reuse them.
+    Keys are derived from everything printed on the certificate, so a stale
+    entry can never be served - invalidation only frees the space early.
+    """
+
+    def __init__(self, max_bytes, disk_dir=None):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.pdf")
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                return data
+
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                return None
+            self._remember(key, data)
+        return data
+
+    def put(self, key, data):
+        self._remember(key, data)
+        if self.disk_dir:
+            # write then rename so another worker never reads a half-written file
+            tmp_path = f"{self._disk_path(key)}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._disk_path(key))
+
+    def _remember(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size -= len(self._entries.pop(key))
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def invalidate_user(self, user_id):
+        """Drops every cached certificate for a user (keys start with their id)."""
+        prefix = f"{user_id}-"
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                self._size -= len(self._entries.pop(key))
+
+        if self.disk_dir:
+            for name in os.listdir(self.disk_dir):
+                if name.startswith(prefix):
+                    try:
+                        os.remove(os.path.join(self.disk_dir, name))
+                    except FileNotFoundError:
+                        pass
+
+
+certificate_cache = CertificateCache(
+    max_bytes=app.config['CERTIFICATE_CACHE_BYTES'],
+    disk_dir=app.config['CERTIFICATE_CACHE_DIR']
+)
+
+
+def certificate_key(user, issued=None):
+    """
+    Cache key / ETag for a user's certificate: their id plus a hash of every
+    value that ends up on the page (name, start date, total hours, issue date).
+    """
+    issued = issued or date.today()
+    parts = [
+        user.name,
+        user.date_created.isoformat() if user.date_created else "",
+        f"{user.total_hours:.1f}",
+        issued.isoformat(),
+    ]
+    digest = hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]
+    return f"{user.id}-{digest}"
+
+
+LOGO_PATH = os.path.join(app.root_path, 'static', 'neopte logo.jpeg')
+WIDTH, HEIGHT = letter  # 612 x 792 points (8.5" x 11")
+
+
+def _layout(has_logo):
+    """Vertical positions of each line of the certificate."""
+    y_pos = HEIGHT - 1 * inch
+    layout = {"header": y_pos}
+
+    y_pos -= (1.5 * inch + 0.5 * inch) if has_logo else 0.8 * inch
+    layout["intro"] = y_pos
+    y_pos -= 0.7 * inch
+    layout["name"] = y_pos
+    y_pos -= 0.8 * inch
+    layout["service"] = y_pos
+    y_pos -= 0.8 * inch
+    layout["hours_intro"] = y_pos
+    y_pos -= 0.6 * inch
+    layout["hours"] = y_pos
+    y_pos -= 1.5 * inch
+    layout["gratitude"] = y_pos
+    y_pos -= 1 * inch
+    layout["signature"] = y_pos
+    y_pos -= 0.3 * inch
+    layout["signature_label"] = y_pos
+    return layout
+
+
+def _new_canvas(buffer):
+    # invariant=1 keeps the output byte-for-byte identical for the same inputs,
+    # so the cache key above can double as a strong ETag
+    return canvas.Canvas(buffer, pagesize=letter, invariant=1)
+
+
+def _draw_centered(pdf, text, y_pos, font, size):
+    pdf.setFont(font, size)
+    text_width = pdf.stringWidth(text, font, size)
+    pdf.drawString((WIDTH - text_width) / 2, y_pos, text)
+    return text_width
+
+
+def _draw_static_layer(pdf, layout, has_logo):
+    """Everything that is identical on every certificate."""
+
+    # ---------------------------
+    # OUTER BORDER
+    # ---------------------------
+    pdf.setStrokeColor(colors.HexColor('#2C3E50'))  # Dark blue-gray
+    pdf.setLineWidth(3)
+    pdf.rect(0.5 * inch, 0.5 * inch, WIDTH - 1*inch, HEIGHT - 1*inch)
+    
+    # Inner decorative border
+    pdf.setLineWidth(1)
+    pdf.rect(0.6 * inch, 0.6 * inch, WIDTH - 1.2*inch, HEIGHT - 1.2*inch)
+    
+    # ---------------------------
+    # HEADER SECTION WITH LOGO
+    # ---------------------------
+    if has_logo:
+        # Logo stretched almost to borders, stopping just before the inner border
+        logo_width = WIDTH - 1.4 * inch
+        logo_height = 1.5 * inch
+        pdf.drawImage(LOGO_PATH, 0.7 * inch, layout["header"] - logo_height,
+                     width=logo_width, height=logo_height, 
+                     preserveAspectRatio=True, mask='auto')
+    else:
+        # Fallback to text if logo not found
+        pdf.setFillColor(colors.HexColor('#2C3E50'))
+        _draw_centered(pdf, "Neopte Foundation", layout["header"], "Helvetica-Bold", 28)
+    
+    # ---------------------------
+    # FIXED WORDING
+    # ---------------------------
+    pdf.setFillColor(colors.black)
+    _draw_centered(pdf, "This certifies that", layout["intro"], "Helvetica", 14)
+    _draw_centered(pdf, "contributing a total of", layout["hours_intro"], "Helvetica", 14)
+    
+    # ---------------------------
+    # FOOTER - Gratitude message
+    # ---------------------------
+    pdf.setFillColor(colors.HexColor('#7F8C8D'))
+    _draw_centered(pdf, "We deeply appreciate your dedication and service to our community.",
+                   layout["gratitude"], "Helvetica-Oblique", 11)
+    
+    # Signature line
+    pdf.setStrokeColor(colors.black)
+    pdf.setLineWidth(1)
+    sig_start = WIDTH / 2 - 2 * inch
+    pdf.line(sig_start, layout["signature"], sig_start + 4*inch, layout["signature"])
+    
+    # Signature label
+    pdf.setFillColor(colors.black)
+    _draw_centered(pdf, "Executive Director, Neopte Foundation", layout["signature_label"], "Helvetica", 10)
+
+
+def _draw_variable_fields(pdf, layout, user, issued):
+    """The per-volunteer fields: name, start date, hours, certificate ID, issue date."""
+
+    # VOLUNTEER NAME - The star of the show!
+    pdf.setFillColor(colors.HexColor('#3498DB'))  # Blue
+    y_pos = layout["name"]
+    name_width = _draw_centered(pdf, user.name, y_pos, "Helvetica-Bold", 24)
+    
+    # Underline the name for emphasis
+    pdf.setStrokeColor(colors.HexColor('#3498DB'))
+    pdf.setLineWidth(1)
+    pdf.line((WIDTH - name_width) / 2 - 10, y_pos - 5, 
+             (WIDTH + name_width) / 2 + 10, y_pos - 5)
+    
+    # Service description with start date
+    pdf.setFillColor(colors.black)
+    if user.date_created:
+        start_date = user.date_created.strftime('%B %d, %Y')
+        service_text = f"has been serving with the Neopte Foundation since {start_date}"
+    else:
+        service_text = "has been serving with the Neopte Foundation"
+    _draw_centered(pdf, service_text, layout["service"], "Helvetica", 14)
+    
+    # TOTAL HOURS - Big and bold!
+    pdf.setFillColor(colors.HexColor('#E74C3C'))  # Red for emphasis
+    _draw_centered(pdf, f"{user.total_hours:.1f} volunteer hours", layout["hours"], "Helvetica-Bold", 22)
+    
+    # ---------------------------
+    # METADATA - Bottom of page
+    # ---------------------------
+    pdf.setFont("Helvetica", 8)
+    pdf.setFillColor(colors.HexColor('#BDC3C7'))  # Light gray
+    
+    # Certificate ID (bottom right)
+    pdf.drawString(WIDTH - 2.5*inch, 0.7*inch, f"Certificate ID: NF-{user.id:05d}")
+    
+    # Issue date (bottom left)
+    issue_date = issued.strftime('%B %d, %Y')
+    pdf.drawString(0.7*inch, 0.7*inch, f"Issued: {issue_date}")
+
+
+class CertificateTemplate:
+    """
+    The static layer of the certificate, rendered once.
+
+    The borders, logo, fixed wording and signature line are drawn a single
+    time into a one-page PDF. Each certificate then only draws its variable
+    fields on a blank page, and pypdf merges that overlay onto a copy of the
+    static page, so the logo is never re-encoded. Only public reportlab and
+    pypdf APIs are used, so it keeps working across upgrades of either.
+    """
+
+    def __init__(self, logo_path=LOGO_PATH):
+        self.has_logo = os.path.exists(logo_path)
+        self.layout = _layout(self.has_logo)
+
+        buffer = io.BytesIO()
+        pdf = _new_canvas(buffer)
+        _draw_static_layer(pdf, self.layout, self.has_logo)
+        pdf.showPage()
+        pdf.save()
+        self._static_page = PdfReader(buffer).pages[0]
+
+    def merge(self, overlay):
+        """The finished certificate: the static page with the one-page `overlay` PDF drawn on top."""
+        writer = PdfWriter()
+        page = writer.add_page(self._static_page)
+        page.merge_page(PdfReader(overlay).pages[0])
+        page.compress_content_streams()
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        buffer.seek(0)
+        return buffer
+
+
+def build_certificate_template():
+    """
+    The app-wide CertificateTemplate, or None (certificates are then drawn
+    in full) when it is switched off or can't be built.
+    """
+    if not app.config['CERTIFICATE_TEMPLATE']:
+        return None
+    try:
+        return CertificateTemplate()
+    except Exception:
+        logger.warning("Could not build the certificate template; drawing certificates in full", exc_info=True)
+        return None
+
+
+certificate_template = build_certificate_template()
+
+
+def generate_volunteer_certificate(user, template=None, issued=None):
+    """
+    Generate a professional volunteer certificate PDF.
+    
+    What this does:
+    1. Creates a PDF in memory (BytesIO buffer)
+    2. Draws a professional certificate with borders (or, when a
+       CertificateTemplate is available, only the fields it doesn't have)
+    3. Fills in the volunteer's name, start date, and total hours
+    4. Returns the PDF buffer ready to send
+    
+    Args:
+        user: A User object from your database
+        template: CertificateTemplate to use; defaults to the app-wide one
+        issued: date printed as the issue date; defaults to today
+    
+    Returns:
+        BytesIO buffer containing the PDF data
+    """
+    template = template or certificate_template
+
+    # Create PDF in memory (not on disk!)
+    buffer = io.BytesIO()
+    pdf = _new_canvas(buffer)
+
+    if template:
+        layout = template.layout
+    else:
+        layout = _layout(os.path.exists(LOGO_PATH))
+        _draw_static_layer(pdf, layout, os.path.exists(LOGO_PATH))
+
+    _draw_variable_fields(pdf, layout, user, issued or date.today())
+    
+    # Finalize the PDF
+    pdf.showPage()
+    pdf.save()
+    
+    # Reset buffer to beginning so it can be read
+    buffer.seek(0)
+    if template:
+        return template.merge(buffer)
+    return buffer
+
+
+def certificate_response(user, as_attachment, download_name):
+    """
+    Sends a user's certificate, answering 304 when the browser already has
+    this exact version and only rendering the PDF on a cache miss.
+    """
+    # One date for both, so a request spanning midnight can't cache
+    # yesterday's certificate under today's key
+    issued = date.today()
+    key = certificate_key(user, issued)
+
+    if key in request.if_none_match:
+        response = app.response_class(status=304)
+    else:
+        data = certificate_cache.get(key)
+        if data is None:
+            data = generate_volunteer_certificate(user, issued=issued).getvalue()
+            certificate_cache.put(key, data)
+
+        response = send_file(
+            io.BytesIO(data),
+            mimetype='application/pdf',
+            as_attachment=as_attachment,
+            download_name=download_name,
+            conditional=False
+        )
+
+    response.set_etag(key)
+    # Private to the user, and re-checked every time since hours can change
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def certificate_export_users(role=None):
+    """
+    Users to include in a bulk export: everyone with the given role, or
+    everyone who has logged approved hours. Only the fields printed on the
+    certificate are selected, as plain tuples that can be sent to workers.
+    """
+    query = db.select(User.id, User.name, User.total_hours, User.date_created).order_by(User.id)
+    if role:
+        query = query.where(User.role == role)
+    else:
+        query = query.where(User.total_hours > 0)
+    return [tuple(row) for row in db.session.execute(query)]
+
+
+def _render_for_export(fields):
+    # Runs in a worker process; gets a plain tuple instead of an ORM object
+    user_id, name, total_hours, date_created = fields
+    user = SimpleNamespace(id=user_id, name=name, total_hours=total_hours, date_created=date_created)
+    return generate_volunteer_certificate(user).getvalue()
+
+
+def render_certificates(users, workers=None):
+    """
+    Renders certificates for `users` (tuples from certificate_export_users)
+    and yields (fields, pdf_bytes) in order.
+
+    By default they are rendered in this process, which is what web requests
+    use. With `workers` (the export-certificates command) they are spread
+    over a pool of freshly spawned processes (nothing inherited from this
+    one, such as database connections), with only a few certificates per
+    worker in flight so memory stays flat however many users there are. The
+    pool is shut down, dropping queued work, even if the caller stops early.
+    """
+    if not workers:
+        for fields in users:
+            yield fields, _render_for_export(fields)
+        return
+
+    pending = deque()
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        for fields in users:
+            pending.append((fields, pool.submit(_render_for_export, fields)))
+            if len(pending) >= workers * 4:
+                fields, future = pending.popleft()
+                yield fields, future.result()
+        while pending:
+            fields, future = pending.popleft()
+            yield fields, future.result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+class _ZipChunks(io.RawIOBase):
+    """Write-only sink for zipfile that hands back whatever was written so far."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def certificate_zip_stream(users, workers=None):
+    """
+    Yields a ZIP archive of certificates piece by piece, one file at a time,
+    so the whole archive is never held in memory. `workers` is passed to
+    render_certificates (leave it unset when serving a request).
+    """
+    sink = _ZipChunks()
+    # PDFs are already compressed, so store them as-is
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED) as archive:
+        for (user_id, name, _, _), data in render_certificates(users, workers):
+            filename = secure_filename(f"neopte_volunteer_certificate_{user_id:05d}_{name}.pdf")
+            archive.writestr(filename, data)
+            yield sink.drain()
+    yield sink.drain()
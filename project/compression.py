@@ -0,0 +1,80 @@
+import gzip
+import zlib
+
+from flask import request
+from project import app
+
+try:
+    import brotli
+except ImportError:  # optional: without it responses are only gzipped
+    brotli = None
+
+# Dynamic responses are compressed at moderate levels: most of the gain, little CPU
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _choose_encoding():
+    if brotli is not None and request.accept_encodings["br"]:
+        return "br"
+    if request.accept_encodings["gzip"]:
+        return "gzip"
+    return None
+
+
+def _compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _compress_stream(chunks, encoding):
+    # Flush after every chunk so streamed pages still arrive progressively
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        for chunk in chunks:
+            if chunk:
+                yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+    else:
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # 31 = gzip container
+        for chunk in chunks:
+            if chunk:
+                yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
+
+
+def compress_response(response):
+    """
+    after_request hook: gzip/brotli-encodes HTML, JSON and other text
+    responses, including streamed ones. Skipped for small bodies (under
+    COMPRESS_MIN_SIZE), files (send_file passes them through; static assets
+    are precompressed) and anything already encoded.
+    """
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in app.config['COMPRESS_MIMETYPES']
+            # (werkzeug's cache_control.no_transform reads a bare directive as None)
+            or "no-transform" in response.cache_control):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    if response.is_streamed:
+        response.response = _compress_stream(response.iter_encoded(), encoding)
+        response.headers.pop("Content-Length", None)
+    else:
+        data = response.get_data()
+        if len(data) < app.config['COMPRESS_MIN_SIZE']:
+            return response
+        response.set_data(_compress(data, encoding))
+
+    response.content_encoding = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(f"{etag}.{encoding}")  # the encoded body is a different representation
+    return response
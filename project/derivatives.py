@@ -0,0 +1,179 @@
+import hashlib
+import io
+import logging
+import os
+import tempfile
+
+import pikepdf
+from project import app, db
+from project.background import run_later
+from project.models import Document
+from project.uploads import StagedUpload, CHUNK_SIZE, blob_lock, blob_path
+
+logger = logging.getLogger(__name__)
+
+# Images smaller than this aren't worth re-encoding
+MIN_RECOMPRESS_BYTES = 64 * 1024
+
+
+def _recompress_images(pdf, quality):
+    """
+    Re-encodes large plain RGB/grey images as JPEG when that saves at least
+    10%. Anything unusual (masks, ICC profiles, decode arrays, 16-bit) is left alone.
+    """
+    for obj in pdf.objects:
+        if not isinstance(obj, pikepdf.Stream) or obj.get("/Subtype") != pikepdf.Name.Image:
+            continue
+        if obj.get("/ColorSpace") not in (pikepdf.Name.DeviceRGB, pikepdf.Name.DeviceGray):
+            continue
+        if obj.get("/BitsPerComponent") != 8 or "/Decode" in obj or "/ImageMask" in obj:
+            continue
+        raw_size = len(obj.read_raw_bytes())
+        if raw_size < MIN_RECOMPRESS_BYTES:
+            continue
+        try:
+            image = pikepdf.PdfImage(obj).as_pil_image()
+        except Exception:
+            continue  # a filter Pillow can't decode
+        if image.mode not in ("RGB", "L"):
+            continue
+        buffer = io.BytesIO()
+        image.save(buffer, "JPEG", quality=quality, optimize=True)
+        if buffer.tell() < raw_size * 0.9:
+            obj.write(buffer.getvalue(), filter=pikepdf.Name.DCTDecode)
+            if "/DecodeParms" in obj:
+                del obj.DecodeParms
+
+
+def optimize_pdf(src_path, dest_path, recompress_images=False, quality=75):
+    """
+    Writes a web-optimised copy of a PDF: linearized (page one and the
+    cross-reference come first, so viewers can render it while the rest
+    downloads over Range requests), unused resources dropped, object streams
+    packed, and optionally large images re-encoded.
+    Returns True if the source was already linearized.
+    """
+    with pikepdf.open(src_path) as pdf:
+        already_linearized = pdf.is_linearized
+        pdf.remove_unreferenced_resources()
+        if recompress_images:
+            _recompress_images(pdf, quality)
+        pdf.save(
+            dest_path,
+            linearize=True,
+            object_stream_mode=pikepdf.ObjectStreamMode.generate,
+            compress_streams=True,
+        )
+    return already_linearized
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _known_derivative(sha256):
+    # Identical uploads share a blob, so they can share its web copy too
+    return db.session.execute(
+        db.select(Document.web_sha256, Document.web_size)
+        .where(Document.sha256 == sha256, Document.web_sha256.isnot(None))
+        .limit(1)
+    ).first()
+
+
+def _touch_blob(sha256):
+    """Restarts a blob's grace period (see release_blobs). False if it is gone."""
+    path = blob_path(sha256)
+    with blob_lock(path):
+        if not os.path.exists(path):
+            return False
+        os.utime(path)
+        return True
+
+
+def optimize_document(doc):
+    """
+    Produces (or reuses) the web copy of one document and records it on the
+    row. The original blob is never touched. The caller commits.
+
+    Until that commit nothing references the web copy, so it is only kept
+    alive by its fresh mtime: release_blobs() spares blobs touched in the last
+    BLOB_GRACE_SECONDS. Commit well within that window.
+    """
+    if not doc.sha256:
+        return  # legacy file outside the blob store
+    original = blob_path(doc.sha256)
+    if not os.path.exists(original):
+        logger.warning("Document file %s is missing, skipping optimisation", original)
+        return
+    if doc.size is None:
+        doc.size = os.path.getsize(original)
+
+    known = _known_derivative(doc.sha256)
+    # the other document may be deleted before we commit, so claim its copy
+    if known is not None and _touch_blob(known.web_sha256):
+        doc.web_sha256, doc.web_size = known
+        return
+
+    fd, temp_path = tempfile.mkstemp(dir=app.config['UPLOAD_PATH'], prefix=".web-", suffix=".part")
+    os.close(fd)
+    try:
+        already_linearized = optimize_pdf(
+            original, temp_path,
+            recompress_images=app.config['PDF_RECOMPRESS_IMAGES'],
+            quality=app.config['PDF_IMAGE_QUALITY'],
+        )
+    except Exception:
+        os.remove(temp_path)
+        logger.warning("Could not optimise %s, serving the original", original, exc_info=True)
+        doc.web_sha256, doc.web_size = doc.sha256, doc.size
+        return
+
+    web_size = os.path.getsize(temp_path)
+    if already_linearized and web_size >= doc.size:
+        # Nothing gained, the original already streams well
+        os.remove(temp_path)
+        doc.web_sha256, doc.web_size = doc.sha256, doc.size
+        return
+
+    derivative = StagedUpload(temp_path, web_size, _file_sha256(temp_path))
+    derivative.commit(blob_path(derivative.sha256))
+    doc.web_sha256, doc.web_size = derivative.sha256, derivative.size
+
+
+def optimize_documents(doc_ids):
+    """
+    Optimises the given documents, committing after each one. A document that
+    fails is logged and rolled back without stopping the rest; their ids are
+    returned.
+    """
+    failed = []
+    for doc_id in doc_ids:
+        try:
+            doc = db.session.get(Document, doc_id)
+            if doc is not None:
+                optimize_document(doc)
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.exception("Could not optimise document %s", doc_id)
+            failed.append(doc_id)
+    return failed
+
+
+def optimize_documents_later(doc_ids):
+    """Queues freshly uploaded documents for optimisation (see run_later)."""
+    doc_ids = list(doc_ids)
+    if doc_ids:
+        run_later(optimize_documents, doc_ids)
+
+
+def unoptimized_document_ids():
+    return db.session.execute(
+        db.select(Document.id)
+        .where(Document.sha256.isnot(None), Document.web_sha256.is_(None))
+        .order_by(Document.id)
+    ).scalars().all()
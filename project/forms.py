@@ -103,12 +103,15 @@ class CreateTaskAssignmentForm(FlaskForm):
         default=False
     )
     
-    # Multi-select for specific users (only shown when assigned_role == 'specific')
+    # Specific users (only shown when assigned_role == 'specific'); picked with
+    # the user search typeahead, so there is no fixed list of choices.
+    # IDs that don't exist are skipped when the task is assigned.
     users_selected = SelectMultipleField(
         'Select Specific Users',
         coerce=int,  # Converts string IDs to integers
         validators=[Optional()],
-        choices=[]  # Set dynamically in the route
+        choices=[],
+        validate_choice=False
     )
     
     submit = SubmitField('Complete Task Creation')
@@ -0,0 +1,141 @@
+from collections import defaultdict
+
+from sqlalchemy import bindparam, func
+from project import db
+from project.activity import log_events
+from project.models import Hours, User
+
+HOURS_STATUSES = ("Pending", "Approved", "Denied")
+
+# Most entries one bulk request may change
+MAX_BULK_HOURS = 500
+
+# Totals closer than this are considered equal (they are sums of floats)
+DRIFT_TOLERANCE = 1e-6
+
+
+def total_hours_delta(old_status, new_status, amount):
+    """How much a status change moves the owner's total_hours."""
+    if old_status == new_status:
+        return 0.0
+    if new_status == "Approved":
+        return amount
+    if old_status == "Approved":
+        return -amount
+    return 0.0
+
+
+def _mark(log_ids, new_status, *conditions):
+    # One conditional UPDATE; RETURNING tells us exactly which rows it changed
+    return db.session.execute(
+        db.update(Hours)
+        .where(Hours.id.in_(log_ids), *conditions)
+        .values(status=new_status)
+        .returning(Hours.id, Hours.user_id, Hours.amount)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+
+def change_hours_statuses(log_ids, new_status, actor):
+    """
+    Moves many hours entries to `new_status` in set-based SQL and adjusts
+    their owners' totals. Does NOT commit.
+
+    Statuses change through conditional UPDATEs, one per status a row can
+    be leaving (at most two), so RETURNING tells us exactly which rows each
+    one changed and what they were before. Totals then move with an SQL
+    increment per affected user (total_hours = total_hours + delta), and
+    every change is logged with a single INSERT. A concurrent request can't
+    lose an update or count hours twice: each row is changed, and counted,
+    by only one of them.
+
+    Returns a list of (log_id, user_id, old_status) for the rows that changed.
+    """
+    log_ids = list(set(log_ids))
+    if not log_ids:
+        return []
+
+    changed = []  # (id, user_id, amount, old_status)
+    for old_status in HOURS_STATUSES:
+        if old_status != new_status:
+            changed += [(*row, old_status) for row in _mark(log_ids, new_status, Hours.status == old_status)]
+
+    deltas = defaultdict(float)
+    for _, user_id, amount, old_status in changed:
+        deltas[user_id] += total_hours_delta(old_status, new_status, amount)
+    increments = [{"user_id": user_id, "delta": delta} for user_id, delta in deltas.items() if delta]
+    if increments:
+        db.session.execute(
+            db.update(User.__table__)
+            .where(User.__table__.c.id == bindparam("user_id"))
+            .values(total_hours=User.__table__.c.total_hours + bindparam("delta")),
+            increments,
+        )
+
+    log_events(
+        [
+            {
+                "action": "hours_status_changed",
+                "target_type": "Hours",
+                "target_id": log_id,
+                "details": {
+                    "old_status": old_status,
+                    "new_status": new_status,
+                    "amount": amount,
+                    "user_id": user_id
+                }
+            }
+            for log_id, user_id, amount, old_status in changed
+        ],
+        actor=actor,
+    )
+    return [(log_id, user_id, old_status) for log_id, user_id, _, old_status in changed]
+
+
+def change_hours_status(log_id, new_status, actor):
+    """
+    Single-entry version of change_hours_statuses. Returns (user_id, old_status),
+    or None if the entry doesn't exist or already had that status.
+    """
+    changed = change_hours_statuses([log_id], new_status, actor)
+    if not changed:
+        return None
+    _, user_id, old_status = changed[0]
+    return user_id, old_status
+
+
+def hours_drift():
+    """
+    Users whose stored total_hours doesn't match the sum of their approved
+    hours, worked out with a single GROUP BY. Returns (id, name, stored, actual) rows.
+    """
+    approved = (
+        db.select(Hours.user_id, func.sum(Hours.amount).label("amount"))
+        .where(Hours.status == "Approved")
+        .group_by(Hours.user_id)
+        .subquery()
+    )
+    actual = func.coalesce(approved.c.amount, 0.0)
+    return db.session.execute(
+        db.select(User.id, User.name, User.total_hours, actual.label("actual"))
+        .outerjoin(approved, approved.c.user_id == User.id)
+        .where(func.abs(func.coalesce(User.total_hours, 0.0) - actual) > DRIFT_TOLERANCE)
+        .order_by(User.id)
+    ).all()
+
+
+def fix_hours_drift(user_ids):
+    """Recomputes total_hours for the given users in one UPDATE. Does NOT commit."""
+    if not user_ids:
+        return
+    approved_sum = (
+        db.select(func.coalesce(func.sum(Hours.amount), 0.0))
+        .where(Hours.user_id == User.id, Hours.status == "Approved")
+        .scalar_subquery()
+    )
+    db.session.execute(
+        db.update(User)
+        .where(User.id.in_(user_ids))
+        .values(total_hours=approved_sum)
+        .execution_options(synchronize_session=False)
+    )
@@ -1,4 +1,4 @@
-from project import db, login_manager 
+from project import db
 from werkzeug.security import generate_password_hash,check_password_hash
 from flask_login import UserMixin
 from typing import List
@@ -6,23 +6,20 @@ from sqlalchemy import Date, DateTime, func, text, JSON
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from datetime import date, datetime
 
-
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(user_id)
+# The login_manager.user_loader (with its cache) lives in project/principal.py
 
 class User(db.Model, UserMixin):
     __tablename__ = 'users'
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    name: Mapped[str] = mapped_column()
+    name: Mapped[str] = mapped_column(index=True)
     email: Mapped[str] = mapped_column(unique=True)
     address: Mapped[str] = mapped_column(default="None Provided")
     password_hash: Mapped[str] = mapped_column(db.String(128))
     date_created: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
     total_hours: Mapped[float] = mapped_column(default=0.0)
     picture: Mapped[str] = mapped_column(default="default.jpeg")
-    role: Mapped[str] = mapped_column(default="user")  # "user", "volunteer", " intern", "board"
+    role: Mapped[str] = mapped_column(default="user", index=True)  # "user", "volunteer", " intern", "board"
 
     hours: Mapped[List["Hours"]] = relationship("Hours", back_populates="user", cascade="all, delete-orphan")
     documents: Mapped[List["Document"]] = relationship("Document", back_populates="user", cascade="all, delete-orphan")
@@ -45,6 +42,10 @@ class User(db.Model, UserMixin):
 class Hours(db.Model):
 
     __tablename__ = 'hours'
+    __table_args__ = (
+        db.Index("ix_hours_status_date", "status", "date"),  # pending hours queue
+        db.Index("ix_hours_user_id_status", "fk_hours_user_id", "status"),  # one user's hours log
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     activity_name: Mapped[str] = mapped_column()
@@ -74,25 +75,40 @@ class Hours(db.Model):
 
 class Document(db.Model):
     __tablename__ = 'documents'
+    __table_args__ = (
+        db.Index("ix_documents_status_uploaded_at", "status", "uploaded_at"),  # pending documents queue
+        db.Index("ix_documents_user_id_status", "fk_documents_user_id", "status"),  # one user's documents
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     filename: Mapped[str] = mapped_column()
     doctype: Mapped[str] = mapped_column()
     status: Mapped[str] = mapped_column(default=("Pending"))  # "pending", "approved", "denied"
     description: Mapped[str] = mapped_column(default="No description provided")
+    uploaded_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    sha256: Mapped[str] = mapped_column(db.String(64), nullable=True, index=True)  # content hash / blob store key
+    size: Mapped[int] = mapped_column(nullable=True)  # bytes, as uploaded
+    web_sha256: Mapped[str] = mapped_column(db.String(64), nullable=True, index=True)  # linearized copy served inline
+    web_size: Mapped[int] = mapped_column(nullable=True)
     user: Mapped["User"] = relationship("User", back_populates="documents")
 
     user_id: Mapped[int] = mapped_column(db.ForeignKey('users.id'), name="fk_documents_user_id")
 
-    def __init__(self, filename, doctype, user, description = "No description provided",status = "Pending"):
+    def __init__(self, filename, doctype, user, description = "No description provided",status = "Pending", sha256=None, size=None):
         self.filename = filename
         self.doctype = doctype
         self.user = user
         self.description = description
         self.status = status 
+        self.sha256 = sha256
+        self.size = size
 
 class ActivityLog(db.Model):
     __tablename__ = "activity_logs"
+    __table_args__ = (
+        db.Index("ix_activity_logs_created_at", "created_at"),  # newest-first notification feed
+        db.Index("ix_activity_logs_actor_id_created_at", "actor_id", "created_at"),  # feed filtered by actor
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -152,6 +168,9 @@ class Task(db.Model):
 
 class TaskAssignment(db.Model):
     __tablename__ = 'task_assignments'
+    __table_args__ = (
+        db.Index("ix_task_assignments_user_id_due_date", "fk_taskassign_user_id", "due_date"),  # a user's tasks by due date
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     task_id: Mapped[int] = mapped_column(db.ForeignKey('tasks.id'), name="fk_taskassign_task_id")
@@ -0,0 +1,113 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import NamedTuple
+
+from sqlalchemy import String, and_, literal, or_
+from project import db
+
+# Default and maximum number of rows returned per page
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class Page(NamedTuple):
+    items: list
+    next_cursor: str | None
+
+
+def encode_cursor(*values):
+    """
+    Packs the sort key of the last row on a page into an opaque,
+    URL-safe string that the client sends back to get the next page.
+    """
+    raw = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(raw).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Reverse of encode_cursor. Returns None for a missing or tampered cursor
+    so the caller simply starts from the first page.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def page_size(requested):
+    """Clamp a user supplied ?limit= to something sane."""
+    if not requested or requested < 1:
+        return PAGE_SIZE
+    return min(requested, MAX_PAGE_SIZE)
+
+
+def datetime_param(value):
+    """
+    Bind parameter for comparing a DateTime column against `value`.
+
+    SQLite keeps CURRENT_TIMESTAMP defaults as 'YYYY-MM-DD HH:MM:SS' text,
+    so compare against the same shape instead of SQLAlchemy's microsecond format.
+    """
+    if db.engine.dialect.name == "sqlite":
+        fmt = "%Y-%m-%d %H:%M:%S.%f" if value.microsecond else "%Y-%m-%d %H:%M:%S"
+        return literal(value.strftime(fmt), String)
+    return value
+
+
+def _bind(column, value):
+    # Turn a decoded cursor value back into something comparable with the column
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime_param(datetime.fromisoformat(value))
+    if python_type is date:
+        return date.fromisoformat(value)
+    return value
+
+
+def keyset_filter(columns, values, descending=False):
+    """
+    Builds the "rows strictly after this key" condition for a keyset
+    (seek) page, e.g. (date > d) OR (date = d AND id > i).
+    """
+    values = [_bind(col, val) for col, val in zip(columns, values)]
+    clauses = []
+    for i, col in enumerate(columns):
+        prefix = [columns[j] == values[j] for j in range(i)]
+        step = col < values[i] if descending else col > values[i]
+        clauses.append(and_(*prefix, step))
+    return or_(*clauses)
+
+
+def keyset_paginate(query, columns, key, cursor=None, limit=PAGE_SIZE, descending=False, scalars=True):
+    """
+    Runs `query` one page at a time ordered by `columns` (the last one must be
+    unique, normally the primary key). `key` pulls the same values out of a
+    result row so the next cursor can be built.
+
+    Only limit + 1 rows are ever read, no matter how big the table is.
+    """
+    order = [col.desc() if descending else col.asc() for col in columns]
+    query = query.order_by(*order)
+
+    values = decode_cursor(cursor)
+    if values is not None and len(values) == len(columns):
+        try:
+            query = query.where(keyset_filter(columns, values, descending))
+        except (ValueError, TypeError):
+            pass  # bad cursor, start from the top
+
+    result = db.session.execute(query.limit(limit + 1))
+    rows = result.scalars().all() if scalars else result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(*key(rows[-1]))
+
+    return Page(items=rows, next_cursor=next_cursor)
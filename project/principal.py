@@ -0,0 +1,126 @@
+import os
+import tempfile
+import threading
+import time
+
+from flask_login import UserMixin, current_user
+from project import app, db, login_manager
+from project.models import User
+
+
+class Principal(UserMixin):
+    """
+    The signed-in user as the login cache keeps them: id, name, role and
+    picture, which is all permission checks and the navbar need. Reading
+    anything else (email, hours, ...) loads the full User row, once per request.
+    """
+
+    def __init__(self, id, name, role, picture):
+        self._user = None
+        self.id = id
+        self.name = name
+        self.role = role
+        self.picture = picture
+
+    def load(self):
+        """The full User row (None if it has been deleted since)."""
+        if self._user is None:
+            self._user = db.session.get(User, self.id)
+        return self._user
+
+    def __getattr__(self, name):
+        # Only reached for attributes not set in __init__
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+
+class UserCache:
+    """
+    Per-worker cache of Principals, so an authenticated request normally
+    doesn't query the users table.
+
+    Entries expire after `ttl` seconds. invalidate() drops a user's entry
+    and, if `versions_dir` is set, replaces a small per-user version file
+    there. Every lookup compares that file against the version the entry
+    was loaded at (one stat()), so a role change made by any worker sharing
+    that directory applies to the very next request. Workers on other hosts
+    only see it when their entry expires. With ttl=0 nothing is cached.
+    """
+
+    def __init__(self, ttl, versions_dir=None):
+        self.ttl = ttl
+        self.versions_dir = versions_dir
+        self._entries = {}  # user id -> (fields, version, expires)
+        self._lock = threading.Lock()
+        if ttl and versions_dir:
+            os.makedirs(versions_dir, exist_ok=True)
+
+    def _version_path(self, user_id):
+        return os.path.join(self.versions_dir, str(user_id))
+
+    def _version(self, user_id):
+        if not self.versions_dir:
+            return None
+        try:
+            stat = os.stat(self._version_path(user_id))
+        except FileNotFoundError:
+            return None
+        # replaced (not rewritten) on every change, so the inode moves too
+        return stat.st_ino, stat.st_mtime_ns
+
+    def load(self, user_id):
+        """The Principal for `user_id`, from the cache or one narrow SELECT."""
+        version = self._version(user_id)  # read before the row, so a change in between forces a reload
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+        if entry is not None:
+            fields, cached_version, expires = entry
+            if cached_version == version and now < expires:
+                return Principal(*fields)
+
+        row = db.session.execute(
+            db.select(User.id, User.name, User.role, User.picture).where(User.id == user_id)
+        ).first()
+        if row is None:
+            self.invalidate(user_id, bump=False)
+            return None
+        with self._lock:
+            self._entries[user_id] = (tuple(row), version, now + self.ttl)
+        return Principal(*row)
+
+    def invalidate(self, user_id, bump=True):
+        """Forgets a user whose name, role or picture changed, or who was deleted."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+        if bump and self.ttl and self.versions_dir:
+            fd, temp_path = tempfile.mkstemp(dir=self.versions_dir, prefix=".version-")
+            os.close(fd)
+            os.replace(temp_path, self._version_path(user_id))
+
+
+user_cache = UserCache(
+    ttl=app.config['USER_CACHE_TTL'],
+    versions_dir=app.config['USER_CACHE_DIR']
+)
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+    if not user_cache.ttl:
+        return db.session.get(User, user_id)
+    return user_cache.load(user_id)
+
+
+def current_user_record():
+    """
+    The signed-in user as a full User row, for code that needs the ORM
+    object itself (relationships, changing columns) rather than current_user.
+    """
+    user = current_user._get_current_object()
+    return user.load() if isinstance(user, Principal) else user
@@ -0,0 +1,149 @@
+from datetime import datetime, timedelta
+from sqlalchemy.orm import contains_eager
+from project import db
+from project.activity import log_events
+from project.models import Hours, Document
+from project.pagination import keyset_paginate, datetime_param, PAGE_SIZE
+
+DOCUMENT_STATUSES = ("Pending", "Approved", "Denied")
+
+# Most documents one bulk request may change
+MAX_BULK_DOCUMENTS = 1000
+
+
+def pending_hours_page(cursor=None, limit=PAGE_SIZE):
+    """
+    One page of the board's hours review queue, oldest first.
+
+    Selects only Pending rows straight from the hours table and pulls
+    the owning user in the same query, so the cost is one query per page
+    no matter how many users or how much approved history exists.
+    """
+    query = (
+        db.select(Hours)
+        .join(Hours.user)
+        .options(contains_eager(Hours.user))
+        .where(Hours.status == "Pending")
+    )
+    return keyset_paginate(
+        query,
+        columns=[Hours.date, Hours.id],
+        key=lambda log: (log.date, log.id),
+        cursor=cursor,
+        limit=limit,
+    )
+
+
+def hours_to_dict(log):
+    return {
+        "id": log.id,
+        "user_id": log.user_id,
+        "user_name": log.user.name,
+        "activity_name": log.activity_name,
+        "date": log.date.isoformat() if log.date else None,
+        "start_time": log.start_time.isoformat() if log.start_time else None,
+        "end_time": log.end_time.isoformat() if log.end_time else None,
+        "amount": log.amount,
+        "description": log.description,
+        "status": log.status,
+    }
+
+
+def pending_documents_page(cursor=None, limit=PAGE_SIZE, doctype=None, user_id=None, since=None, until=None):
+    """
+    One page of the board's document review queue, oldest upload first.
+
+    Only Pending documents are ever selected; approved and denied ones never
+    leave the database. Optional filters narrow the queue by content type,
+    uploader and upload date (since/until are inclusive dates).
+    """
+    query = (
+        db.select(Document)
+        .join(Document.user)
+        .options(contains_eager(Document.user))
+        .where(Document.status == "Pending")
+    )
+    if doctype:
+        query = query.where(Document.doctype == doctype)
+    if user_id:
+        query = query.where(Document.user_id == user_id)
+    if since:
+        query = query.where(Document.uploaded_at >= datetime_param(datetime.combine(since, datetime.min.time())))
+    if until:
+        query = query.where(Document.uploaded_at < datetime_param(datetime.combine(until + timedelta(days=1), datetime.min.time())))
+
+    return keyset_paginate(
+        query,
+        columns=[Document.uploaded_at, Document.id],
+        key=lambda doc: (doc.uploaded_at, doc.id),
+        cursor=cursor,
+        limit=limit,
+    )
+
+
+def document_to_dict(doc):
+    return {
+        "id": doc.id,
+        "user_id": doc.user_id,
+        "user_name": doc.user.name,
+        "user_role": doc.user.role,
+        "filename": doc.filename,
+        "doctype": doc.doctype,
+        "description": doc.description,
+        "status": doc.status,
+        "uploaded_at": doc.uploaded_at.isoformat() if doc.uploaded_at else None,
+    }
+
+
+def change_document_statuses(doc_ids, new_status, actor):
+    """
+    Moves many documents to `new_status`: one SELECT to see which exist and
+    what they were, one conditional UPDATE for the ones that actually change,
+    and one INSERT for their activity-log rows. Does NOT commit.
+
+    Returns {doc_id: "updated" | "unchanged" | "not_found"} for every ID given.
+    """
+    doc_ids = list(dict.fromkeys(doc_ids))
+    if not doc_ids:
+        return {}
+
+    old_statuses = dict(db.session.execute(
+        db.select(Document.id, Document.status).where(Document.id.in_(doc_ids))
+    ).all())
+    to_change = [doc_id for doc_id, status in old_statuses.items() if status != new_status]
+
+    updated = set()
+    if to_change:
+        updated = set(db.session.execute(
+            db.update(Document)
+            .where(Document.id.in_(to_change), Document.status != new_status)
+            .values(status=new_status)
+            .returning(Document.id)
+            .execution_options(synchronize_session=False)
+        ).scalars())
+
+    log_events(
+        [
+            {
+                "action": "document_status_changed",
+                "target_type": "Document",
+                "target_id": doc_id,
+                "details": {
+                    "old_status": old_statuses[doc_id],
+                    "new_status": new_status
+                }
+            }
+            for doc_id in to_change if doc_id in updated
+        ],
+        actor=actor,
+    )
+
+    results = {}
+    for doc_id in doc_ids:
+        if doc_id not in old_statuses:
+            results[doc_id] = "not_found"
+        elif doc_id in updated:
+            results[doc_id] = "updated"
+        else:
+            results[doc_id] = "unchanged"
+    return results
@@ -0,0 +1,163 @@
+import logging
+import re
+
+from markupsafe import Markup, escape
+from pypdf import PdfReader
+from sqlalchemy import text
+from project import app, db
+from project.models import Document
+from project.background import run_later
+from project.pagination import Page, encode_cursor, decode_cursor, PAGE_SIZE
+from project.uploads import document_path
+
+logger = logging.getLogger(__name__)
+
+# FTS5 table holding each document's searchable text; its rowid is Document.id.
+# Created by migration 4e7b1a9c2d85 (SQLAlchemy doesn't know about virtual tables).
+FTS_TABLE = "document_text"
+
+# Markers snippet() puts around matches; swapped for <mark> after escaping
+_HIT_START, _HIT_END = "\x02", "\x03"
+
+
+def extract_text(path):
+    """
+    Pulls the text layer out of a PDF, capped at MAX_INDEXED_CHARS.
+    Scanned or broken PDFs just give back what could be read (possibly "").
+    """
+    limit = app.config['MAX_INDEXED_CHARS']
+    parts, length = [], 0
+    try:
+        for page in PdfReader(path).pages:
+            page_text = page.extract_text() or ""
+            parts.append(page_text)
+            length += len(page_text)
+            if length >= limit:
+                break
+    except FileNotFoundError:
+        logger.warning("Document file %s is missing, indexing it without text", path)
+    except Exception:
+        logger.warning("Could not extract text from %s", path, exc_info=True)
+    return "\n".join(parts)[:limit]
+
+
+def _known_text(sha256):
+    # Identical uploads share a blob, so reuse the text already pulled out of it
+    if not sha256:
+        return None
+    return db.session.execute(
+        text(f"SELECT {FTS_TABLE}.body FROM {FTS_TABLE} JOIN documents ON documents.id = {FTS_TABLE}.rowid "
+             "WHERE documents.sha256 = :sha256 LIMIT 1"),
+        {"sha256": sha256},
+    ).scalar()
+
+
+def index_document(doc):
+    """(Re)writes the search entry for one document. The caller commits."""
+    body = _known_text(doc.sha256)
+    if body is None:
+        body = extract_text(document_path(doc))
+    db.session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": doc.id})
+    db.session.execute(
+        text(f"INSERT INTO {FTS_TABLE} (rowid, filename, description, body) "
+             "VALUES (:id, :filename, :description, :body)"),
+        {"id": doc.id, "filename": doc.filename, "description": doc.description or "", "body": body},
+    )
+
+
+def index_documents(doc_ids):
+    """Indexes the given documents, committing after each so readers see them as they land."""
+    for doc_id in doc_ids:
+        doc = db.session.get(Document, doc_id)
+        if doc is not None:
+            index_document(doc)
+            db.session.commit()
+
+
+def index_documents_later(doc_ids):
+    """
+    Queues freshly uploaded documents for text extraction so the upload
+    request doesn't wait on it. Anything lost (e.g. a restart) is picked up
+    by the `flask index-documents` backfill.
+    """
+    doc_ids = list(doc_ids)
+    if doc_ids:
+        run_later(index_documents, doc_ids)
+
+
+def unindex_documents(doc_ids):
+    """Drops search entries for documents being deleted. The caller commits."""
+    for doc_id in doc_ids:
+        db.session.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": doc_id})
+
+
+def unindexed_document_ids():
+    return db.session.execute(
+        text(f"SELECT id FROM documents WHERE id NOT IN (SELECT rowid FROM {FTS_TABLE}) ORDER BY id")
+    ).scalars().all()
+
+
+def match_expression(query, prefix_all=False):
+    """
+    Turns what a person typed into a safe FTS5 query: every word must
+    appear, and the last one (or with prefix_all, every one) may be a
+    prefix (so "eval" finds "evaluation").
+    FTS5 operators and punctuation are treated as plain text.
+    """
+    terms = re.findall(r"\w+", query or "")
+    if not terms:
+        return None
+    quoted = ['"' + term + '"' for term in terms]
+    if prefix_all:
+        quoted = [term + "*" for term in quoted]
+    else:
+        quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _snippet_html(raw):
+    return Markup(str(escape(raw)).replace(_HIT_START, "<mark>").replace(_HIT_END, "</mark>"))
+
+
+def search_documents(query, cursor=None, limit=PAGE_SIZE):
+    """
+    One page of documents matching `query`, best match first (bm25, with
+    filename and description hits weighted above body text). Each hit has
+    an HTML-safe snippet with the matches wrapped in <mark>.
+
+    Everything comes from the index; PDFs are never opened at query time.
+    Ranked results have no natural seek key, so the cursor is an offset.
+    """
+    expression = match_expression(query)
+    if expression is None:
+        return Page(items=[], next_cursor=None)
+
+    values = decode_cursor(cursor)
+    offset = values[0] if values and isinstance(values[0], int) and values[0] > 0 else 0
+
+    rows = db.session.execute(
+        text(
+            f"SELECT documents.id, documents.filename, documents.description, documents.status, "
+            f"documents.uploaded_at, users.id AS user_id, users.name AS user_name, "
+            f"snippet({FTS_TABLE}, -1, :start, :end, '…', 16) AS snippet "
+            f"FROM {FTS_TABLE} "
+            f"JOIN documents ON documents.id = {FTS_TABLE}.rowid "
+            f"JOIN users ON users.id = documents.fk_documents_user_id "
+            f"WHERE {FTS_TABLE} MATCH :expression "
+            f"ORDER BY rank LIMIT :limit OFFSET :offset"
+        ),
+        {"start": _HIT_START, "end": _HIT_END, "expression": expression,
+         "limit": limit + 1, "offset": offset},
+    ).mappings().all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(offset + limit)
+
+    hits = [dict(row, snippet=_snippet_html(row["snippet"] or "")) for row in rows]
+    return Page(items=hits, next_cursor=next_cursor)
+
+
+def hit_to_dict(hit):
+    return dict(hit, snippet=str(hit["snippet"]))
@@ -0,0 +1,97 @@
+// Type-to-search over /users/search/json for any <input data-user-typeahead="URL">.
+//
+// By default picking a suggestion fills the input and submits its form (the
+// user list). With data-pick-into="ID" it instead adds the user as a removable
+// chip to that element, with a hidden input named by data-pick-name (the
+// specific-user task picker).
+document.addEventListener('DOMContentLoaded', () => {
+    document.querySelectorAll('input[data-user-typeahead]').forEach(input => {
+        const url = input.dataset.userTypeahead;
+        const chips = input.dataset.pickInto ? document.getElementById(input.dataset.pickInto) : null;
+        const list = document.createElement('div');
+        list.className = 'list-group user-typeahead-list';
+        input.insertAdjacentElement('afterend', list);
+        input.setAttribute('autocomplete', 'off');
+
+        let timer = null;
+        let pending = null;
+
+        const pickedIds = () => chips
+            ? Array.from(chips.querySelectorAll('input[type=hidden]')).map(hidden => hidden.value)
+            : [];
+
+        const addChip = user => {
+            if (pickedIds().includes(String(user.id))) return;
+            const chip = document.createElement('span');
+            chip.className = 'badge bg-primary me-1 mb-1 user-chip';
+            chip.textContent = `${user.name} (${user.email}) `;
+            const hidden = document.createElement('input');
+            hidden.type = 'hidden';
+            hidden.name = input.dataset.pickName;
+            hidden.value = user.id;
+            const remove = document.createElement('button');
+            remove.type = 'button';
+            remove.className = 'btn-close btn-close-white btn-sm';
+            remove.setAttribute('aria-label', 'Remove');
+            remove.addEventListener('click', () => chip.remove());
+            chip.append(hidden, remove);
+            chips.appendChild(chip);
+        };
+
+        const pick = user => {
+            list.replaceChildren();
+            if (chips) {
+                addChip(user);
+                input.value = '';
+                input.focus();
+            } else {
+                input.value = user.name;
+                input.form.submit();
+            }
+        };
+
+        const show = users => {
+            list.replaceChildren(...users.map(user => {
+                const item = document.createElement('button');
+                item.type = 'button';
+                item.className = 'list-group-item list-group-item-action';
+                item.textContent = `${user.name} · ${user.email} · ${user.role}`;
+                item.addEventListener('click', () => pick(user));
+                return item;
+            }));
+        };
+
+        const search = () => {
+            const q = input.value.trim();
+            if (pending) pending.abort();
+            if (!q) {
+                list.replaceChildren();
+                return;
+            }
+            const params = new URLSearchParams({ q });
+            const role = input.form && input.form.elements.role;
+            if (role && role.value) params.set('role', role.value);
+            pending = new AbortController();
+            fetch(`${url}?${params}`, { signal: pending.signal, headers: { Accept: 'application/json' } })
+                .then(response => response.ok ? response.json() : { items: [] })
+                .then(data => show(data.items))
+                .catch(error => { if (error.name !== 'AbortError') list.replaceChildren(); });
+        };
+
+        input.addEventListener('input', () => {
+            clearTimeout(timer);
+            timer = setTimeout(search, 150);
+        });
+        input.addEventListener('keydown', event => {
+            // In picker mode Enter picks the top suggestion instead of submitting the form
+            if (chips && event.key === 'Enter') {
+                event.preventDefault();
+                const first = list.querySelector('button');
+                if (first) first.click();
+            }
+        });
+        document.addEventListener('click', event => {
+            if (event.target !== input && !list.contains(event.target)) list.replaceChildren();
+        });
+    });
+});
@@ -0,0 +1,204 @@
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import and_, case, func, literal
+from sqlalchemy.orm import joinedload
+from project import db
+from project.activity import log_event
+from project.models import TaskAssignment, User
+from project.pagination import keyset_paginate, PAGE_SIZE
+
+# Roles a task can be assigned to as a whole
+TASK_ROLES = ("intern", "volunteer", "board")
+
+# How many recipients the create-task preview lists by name
+RECIPIENT_PREVIEW = 50
+
+
+def role_recipients(role, limit=RECIPIENT_PREVIEW):
+    """
+    Count of users with `role` plus the first `limit` of them (name and
+    email only) for the create-task preview, without loading the whole role.
+    """
+    count = db.session.scalar(db.select(func.count()).select_from(User).where(User.role == role))
+    preview = db.session.execute(
+        db.select(User.name, User.email).where(User.role == role).order_by(User.name).limit(limit)
+    ).all()
+    return count, preview
+
+
+def fan_out_statement(task_id, users_query, due_date, upload):
+    """
+    INSERT INTO task_assignments (...) SELECT :task_id, users.id, ... FROM users WHERE ...
+    for every user `users_query` (a select of User.id) matches.
+    """
+    table = TaskAssignment.__table__
+    rows = users_query.with_only_columns(
+        literal(task_id),
+        User.id,
+        literal(due_date, table.c.due_date.type),
+        literal("pending"),
+        literal(bool(upload)),
+        literal(""),
+    )
+    return db.insert(table).from_select(
+        [table.c.fk_taskassign_task_id, table.c.fk_taskassign_user_id, table.c.due_date,
+         table.c.status, table.c.upload, table.c.comments],
+        rows,
+    )
+
+
+def assign_task(task, due_date, upload, actor, user_ids=None):
+    """
+    Creates the task's assignments with one INSERT ... SELECT straight from
+    the users table: everyone with task.assigned_role, or the given
+    user_ids for "specific" tasks (IDs that don't exist are skipped).
+    No User or TaskAssignment objects are loaded, so a 10k-member role costs
+    one statement. Logs a single "task_assigned" summary row.
+    Does NOT commit. Returns how many users were assigned.
+    """
+    users_query = db.select(User.id)
+    if user_ids is None:
+        users_query = users_query.where(User.role == task.assigned_role)
+    else:
+        users_query = users_query.where(User.id.in_(user_ids))
+
+    count = db.session.execute(fan_out_statement(task.id, users_query, due_date, upload)).rowcount
+
+    log_event(
+        actor=actor,
+        action="task_assigned",
+        target_type="Task",
+        target_id=task.id,
+        details={
+            "assigned_role": task.assigned_role,
+            "assigned_count": count,
+            "due_date": due_date.isoformat() if due_date else None,
+            "upload": bool(upload)
+        }
+    )
+    return count
+
+
+# Sections of the task lists, in display order
+TASK_BUCKETS = ("overdue", "this_week", "next_week", "later")
+# Past-due tasks in these statuses aren't overdue
+FINISHED_STATUSES = ("done", "graded")
+# Most assignments a task list shows per section
+TASKS_PER_BUCKET = 100
+# Orders the board's task overview can be sorted by
+OVERVIEW_SORTS = ("name", "overdue")
+
+
+def _week_bounds(today):
+    """Midnights starting this week (Monday), next week and the week after."""
+    this_week = datetime.combine(today - timedelta(days=today.weekday()), time.min)
+    return this_week, this_week + timedelta(days=7), this_week + timedelta(days=14)
+
+
+def is_overdue(today=None):
+    """SQL condition: the assignment is past due and not finished."""
+    today = today or date.today()
+    return and_(TaskAssignment.due_date < datetime.combine(today, time.min),
+                TaskAssignment.status.notin_(FINISHED_STATUSES))
+
+
+def task_bucket(today=None):
+    """
+    CASE expression putting an assignment in one of TASK_BUCKETS:
+    overdue if it is past due and not finished, otherwise by the week it is
+    due in; anything else (including finished tasks from past weeks) is later.
+    """
+    today = today or date.today()
+    this_week, next_week, week_after = _week_bounds(today)
+    due = TaskAssignment.due_date
+    return case(
+        (is_overdue(today), "overdue"),
+        (and_(due >= this_week, due < next_week), "this_week"),
+        (and_(due >= next_week, due < week_after), "next_week"),
+        else_="later",
+    )
+
+
+def bucketed_assignments(user_id, limit=TASKS_PER_BUCKET, today=None):
+    """
+    A user's assignments grouped into TASK_BUCKETS, each ordered by due date
+    and cut to its first `limit`, with assignment.task already loaded.
+    Bucketing, ordering and limits all happen in one query.
+
+    Returns a list of {"bucket", "assignments", "total"} dicts, in
+    TASK_BUCKETS order, for the buckets that have any assignments; "total"
+    counts the whole bucket, not just the rows returned.
+    """
+    bucket = task_bucket(today)
+    ranked = (
+        db.select(
+            TaskAssignment.id,
+            bucket.label("bucket"),
+            func.row_number().over(partition_by=bucket, order_by=(TaskAssignment.due_date, TaskAssignment.id)).label("position"),
+            func.count().over(partition_by=bucket).label("total"),
+        )
+        .where(TaskAssignment.user_id == user_id)
+        .subquery()
+    )
+    bucket_order = case({name: i for i, name in enumerate(TASK_BUCKETS)}, value=ranked.c.bucket)
+    rows = db.session.execute(
+        db.select(TaskAssignment, ranked.c.bucket, ranked.c.total)
+        .join(ranked, ranked.c.id == TaskAssignment.id)
+        .where(ranked.c.position <= limit)
+        .order_by(bucket_order, ranked.c.position)
+        .options(joinedload(TaskAssignment.task))
+    ).all()
+
+    buckets = {}
+    for assignment, name, total in rows:
+        buckets.setdefault(name, {"bucket": name, "assignments": [], "total": total})["assignments"].append(assignment)
+    return list(buckets.values())
+
+
+def _count(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def task_overview_page(cursor=None, limit=PAGE_SIZE, sort="name", today=None):
+    """
+    One page of the board's task overview: every user with how many of their
+    assignments are pending, done, graded and overdue, and their next due
+    date, all from a single GROUP BY over users LEFT JOIN task_assignments.
+
+    sort="name" pages alphabetically; sort="overdue" puts the users with the
+    most overdue assignments first. Rows have id, name, role, picture,
+    pending, done, graded, overdue and next_due.
+    """
+    today = today or date.today()
+    finished = TaskAssignment.status.in_(FINISHED_STATUSES)
+    upcoming = and_(~finished, TaskAssignment.due_date >= datetime.combine(today, time.min))
+    counts = (
+        db.select(
+            User.id,
+            User.name,
+            User.role,
+            User.picture,
+            _count(and_(TaskAssignment.id.isnot(None), ~finished)).label("pending"),
+            _count(TaskAssignment.status == "done").label("done"),
+            _count(TaskAssignment.status == "graded").label("graded"),
+            _count(is_overdue(today)).label("overdue"),
+            func.min(case((upcoming, TaskAssignment.due_date))).label("next_due"),
+        )
+        .outerjoin(TaskAssignment, TaskAssignment.user_id == User.id)
+        .group_by(User.id)
+        .subquery()
+    )
+
+    if sort == "overdue":
+        columns, descending = [counts.c.overdue, counts.c.id], True
+    else:
+        columns, descending = [counts.c.name, counts.c.id], False
+    return keyset_paginate(
+        db.select(counts),
+        columns=columns,
+        key=lambda row: tuple(getattr(row, col.name) for col in columns),
+        cursor=cursor,
+        limit=limit,
+        descending=descending,
+        scalars=False,
+    )
@@ -0,0 +1,220 @@
+import fcntl
+import hashlib
+import os
+import tempfile
+import time
+import unicodedata
+from contextlib import contextmanager
+from urllib.parse import quote
+
+from flask import request, send_file
+from sqlalchemy import func, or_
+from project import app, db
+from project.models import Document
+
+CHUNK_SIZE = 64 * 1024
+
+# A blob written or reused this recently may belong to an upload whose
+# Document row isn't committed yet, so release_blobs() leaves it alone
+BLOB_GRACE_SECONDS = 5 * 60
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class StagedUpload:
+    """
+    An uploaded file that has been streamed to a temporary file next to its
+    final location, with its size and SHA-256 worked out along the way.
+    Call commit() to move it into place (atomic rename) or discard() to drop it.
+    """
+
+    def __init__(self, temp_path, size, sha256):
+        self.temp_path = temp_path
+        self.size = size
+        self.sha256 = sha256
+        self.path = None
+        self.created = False
+        self._mtime_ns = None  # of a blob we created, to spot reuse by another upload
+
+    def commit(self, path):
+        """
+        Moves the file to `path`. If something is already there (the same blob
+        uploaded before), the temp copy is just dropped and the blob's mtime
+        refreshed, so a concurrent release_blobs() won't delete it before our
+        Document row is committed.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with blob_lock(path):
+            if os.path.exists(path):
+                os.utime(path)
+                os.remove(self.temp_path)
+            else:
+                os.replace(self.temp_path, path)
+                self.created = True
+                self._mtime_ns = os.stat(path).st_mtime_ns
+        self.path = path
+        return path
+
+    def discard(self):
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+        # never remove a blob that existed before this upload, or that
+        # another upload has reused (commit() touched it) since we wrote it
+        if self.created:
+            with blob_lock(self.path):
+                try:
+                    reused = os.stat(self.path).st_mtime_ns != self._mtime_ns
+                except FileNotFoundError:
+                    return
+                if not reused:
+                    os.remove(self.path)
+
+
+def stage_upload(file_storage, directory, max_bytes):
+    """
+    Streams an uploaded file into `directory` in CHUNK_SIZE pieces without
+    ever holding it in memory. Raises UploadTooLarge (and cleans up) as soon
+    as more than `max_bytes` have been read.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".upload-", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = file_storage.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(file_storage.filename)
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+    return StagedUpload(temp_path, size, digest.hexdigest())
+
+
+def blob_path(sha256):
+    """
+    Where the blob with this hash lives, sharded two levels deep
+    (blobs/ab/cd/abcd...) so no directory grows too large.
+    """
+    return os.path.join(app.config['BLOB_PATH'], sha256[:2], sha256[2:4], sha256)
+
+
+@contextmanager
+def blob_lock(path):
+    """
+    Exclusive lock (across threads and worker processes) on one blob, held by
+    StagedUpload.commit(), StagedUpload.discard() and release_blobs() around
+    their exists/unlink steps.
+    """
+    with open(path + ".lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def document_path(doc):
+    """Path of a document's file: its blob, or the old flat location for un-migrated rows."""
+    if doc.sha256:
+        return blob_path(doc.sha256)
+    return os.path.join(app.config['UPLOAD_PATH'], doc.filename)
+
+
+def release_blobs(hashes):
+    """
+    Deletes blobs that no Document refers to any more, as an original or
+    as a web copy. Call after the documents have been deleted and committed.
+
+    References are counted under the blob's lock, and a blob touched in the
+    last BLOB_GRACE_SECONDS is kept: an upload of the same file may have
+    reused it without having committed its Document yet. (Such a blob is
+    simply left behind if nothing ends up referencing it.)
+    """
+    for sha256 in set(filter(None, hashes)):
+        path = blob_path(sha256)
+        if not os.path.exists(path):
+            continue
+        with blob_lock(path):
+            references = db.session.scalar(
+                db.select(func.count()).select_from(Document)
+                .where(or_(Document.sha256 == sha256, Document.web_sha256 == sha256))
+            )
+            try:
+                recent = time.time() - os.path.getmtime(path) < BLOB_GRACE_SECONDS
+            except FileNotFoundError:
+                continue
+            if not references and not recent:
+                os.remove(path)
+
+
+def _set_inline_filename(headers, download_name):
+    # Same encoding send_file uses: quoted ASCII filename, plus RFC 5987 filename* for anything else
+    try:
+        download_name.encode("ascii")
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize("NFKD", download_name).encode("ascii", "ignore").decode("ascii")
+        names = {"filename": simple, "filename*": f"UTF-8''{quote(download_name, safe='')}"}
+    else:
+        names = {"filename": download_name}
+    headers.set("Content-Disposition", "inline", **names)
+
+
+def send_document(doc, download_name, original=False):
+    """
+    Serves a document inline, preferring its linearized web copy (pass
+    original=True for the file exactly as uploaded).
+
+    HTTP caching is tuned for immutable blobs:
+    the content hash is a strong ETag, repeat opens get a 304, byte ranges are
+    honoured so PDF viewers can fetch pages progressively, and the browser may
+    keep its private copy for a long time. If X_ACCEL_REDIRECT_PREFIX or
+    USE_X_SENDFILE is set, the front proxy streams the bytes instead of us.
+    """
+    sha256 = doc.sha256 if original or not doc.web_sha256 else doc.web_sha256
+    path = blob_path(sha256) if sha256 else document_path(doc)
+    # A blob never changes once written; the old flat files can be overwritten
+    max_age = app.config['DOCUMENT_CACHE_MAX_AGE'] if sha256 else 0
+    etag = sha256 or True
+
+    accel_prefix = app.config['X_ACCEL_REDIRECT_PREFIX']
+    if accel_prefix:
+        if sha256 and sha256 in request.if_none_match:
+            response = app.response_class(status=304)
+        else:
+            # nginx serves the file from an internal location mapped onto UPLOAD_PATH
+            relative = os.path.relpath(path, app.config['UPLOAD_PATH']).replace(os.sep, "/")
+            response = app.response_class(mimetype='application/pdf')
+            response.headers['X-Accel-Redirect'] = accel_prefix.rstrip("/") + "/" + relative
+            _set_inline_filename(response.headers, download_name)
+        if sha256:
+            response.set_etag(sha256)
+    else:
+        response = send_file(
+            path,
+            mimetype='application/pdf',
+            download_name=download_name,
+            as_attachment=False,  # <-- makes it open inline
+            conditional=True,  # ETag / Last-Modified / Range handling
+            etag=etag,
+            max_age=max_age
+        )
+        # werkzeug only advertises this on 206s; viewers need it up front
+        response.accept_ranges = "bytes"
+
+    response.cache_control.private = True
+    response.cache_control.public = False
+    if max_age:
+        response.cache_control.max_age = max_age
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+    return response
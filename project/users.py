@@ -0,0 +1,78 @@
+from typing import NamedTuple
+
+from sqlalchemy import text
+from project import db
+from project.avatars import avatar_url
+from project.models import User
+from project.pagination import keyset_paginate, PAGE_SIZE
+from project.search import match_expression
+
+# FTS5 index over users.name and users.email; its rowid is User.id.
+# Created (with the triggers that keep it current) by migration 5d2f8b7a1c46.
+USER_SEARCH_TABLE = "user_search"
+
+USER_ROLES = ("user", "volunteer", "intern", "board", "admin")
+
+# Suggestions a typeahead request returns by default
+TYPEAHEAD_SIZE = 10
+
+
+class UserRow(NamedTuple):
+    """
+    Read-only view of a user for list pages: just the columns they print.
+    Built straight from the selected columns, so no User object (password
+    hash, address, relationships) is created or kept in the session.
+    """
+    id: int
+    name: str
+    email: str
+    role: str
+    picture: str
+
+
+USER_ROW_COLUMNS = (User.id, User.name, User.email, User.role, User.picture)
+
+
+def search_users(query=None, role=None, cursor=None, limit=PAGE_SIZE):
+    """
+    One page of users, alphabetical, whose name or email has words starting
+    with every word of `query` ("jo sm" finds "John Smith" and
+    "jo.smith@..."), optionally only those with `role`.
+
+    Matching goes through the FTS5 prefix index and the role and name order
+    through their B-tree indexes, so no query scans the users table.
+    Items are UserRows.
+    """
+    statement = db.select(*USER_ROW_COLUMNS)
+    expression = match_expression(query, prefix_all=True)
+    if expression is not None:
+        statement = statement.where(
+            text(f"users.id IN (SELECT rowid FROM {USER_SEARCH_TABLE} WHERE {USER_SEARCH_TABLE} MATCH :expression)")
+            .bindparams(expression=expression)
+        )
+    if role:
+        statement = statement.where(User.role == role)
+    page = keyset_paginate(
+        statement,
+        columns=[User.name, User.id],
+        key=lambda row: (row.name, row.id),
+        cursor=cursor,
+        limit=limit,
+        scalars=False,
+    )
+    return page._replace(items=[UserRow._make(row) for row in page.items])
+
+
+def user_rows_page(role=None, cursor=None, limit=PAGE_SIZE):
+    """One page of every user (or every user with `role`) as UserRows, by name."""
+    return search_users(None, role=role, cursor=cursor, limit=limit)
+
+
+def user_to_dict(user):
+    return {
+        "id": user.id,
+        "name": user.name,
+        "email": user.email,
+        "role": user.role,
+        "avatar": avatar_url(user.picture, "thumb"),
+    }
@@ -0,0 +1,138 @@
+import importlib
+import os
+from contextlib import contextmanager
+
+# Point the app at a private in-memory database before project/ is imported,
+# and load the signed-in user fresh on every request (ids repeat across tests)
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["USER_CACHE_TTL"] = "0"
+
+from datetime import date, time
+
+import pytest
+from flask import g
+from sqlalchemy import event, text
+from project import app as flask_app, db
+from project.models import User, Hours, Document, Task
+
+with flask_app.app_context():
+    # app.py seeds demo users on import; give it tables, and the admin it
+    # can't create itself (its User() call has no picture)
+    db.create_all()
+    db.session.add(User("REAL ADMIN", "realadmin@gmail.com", "admin123", "default.jpeg", role="admin"))
+    db.session.commit()
+    importlib.import_module("app")
+    db.session.remove()
+    db.drop_all()
+
+# create_all() doesn't know about the FTS5 tables the migrations create by hand
+FTS_DDL = [
+    "CREATE VIRTUAL TABLE document_text USING fts5("
+    "filename, description, body, tokenize = 'porter unicode61 remove_diacritics 2')",
+    "INSERT INTO document_text (document_text, rank) VALUES ('rank', 'bm25(10.0, 4.0, 1.0)')",
+    "CREATE VIRTUAL TABLE user_search USING fts5(name, email, content = 'users', content_rowid = 'id', "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    "CREATE TRIGGER user_search_insert AFTER INSERT ON users BEGIN "
+    "INSERT INTO user_search (rowid, name, email) VALUES (new.id, new.name, new.email); END",
+    "CREATE TRIGGER user_search_delete AFTER DELETE ON users BEGIN "
+    "INSERT INTO user_search (user_search, rowid, name, email) VALUES ('delete', old.id, old.name, old.email); END",
+    "CREATE TRIGGER user_search_update AFTER UPDATE OF name, email ON users BEGIN "
+    "INSERT INTO user_search (user_search, rowid, name, email) VALUES ('delete', old.id, old.name, old.email); "
+    "INSERT INTO user_search (rowid, name, email) VALUES (new.id, new.name, new.email); END",
+]
+FTS_TABLES = ["document_text", "user_search"]
+
+
+@pytest.fixture
+def app():
+    flask_app.config.update(TESTING=True, WTF_CSRF_ENABLED=False, UPLOADS_IN_BACKGROUND=False)
+    with flask_app.app_context():
+        db.create_all()
+        for statement in FTS_DDL:
+            db.session.execute(text(statement))
+        db.session.commit()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+        for table in FTS_TABLES:
+            db.session.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        db.session.commit()
+
+
+@pytest.fixture
+def count_queries(app):
+    """`with count_queries() as queries:` collects the SQL statements run inside the block."""
+    @contextmanager
+    def count_queries():
+        queries = []
+        def record(conn, cursor, statement, *args):
+            queries.append(statement)
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            yield queries
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+    return count_queries
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login(client):
+    def login(user):
+        with client.session_transaction() as session:
+            session["_user_id"] = str(user.id)
+            session["_fresh"] = True
+        # requests run inside the test's app context, so forget the last request's user
+        g.pop("_login_user", None)
+        return client
+    return login
+
+
+@pytest.fixture
+def make_user(app):
+    def make_user(name="Volunteer", role="volunteer", email=None):
+        user = User(name=name, email=email or f"{name.lower().replace(' ', '.')}@example.com",
+                    password="password", picture="default.jpeg", role=role)
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make_user
+
+
+@pytest.fixture
+def board(make_user):
+    return make_user("Board Member", role="board")
+
+
+@pytest.fixture
+def make_hours(app):
+    def make_hours(user, amount=1.0, day=date(2024, 1, 1), status="Pending"):
+        log = Hours("Tutoring", day, time(9), time(10), amount, "", user, status=status)
+        db.session.add(log)
+        db.session.commit()
+        return log
+    return make_hours
+
+
+@pytest.fixture
+def make_document(app):
+    def make_document(user, status="Pending", doctype="application/pdf", sha256=None):
+        doc = Document("form.pdf", doctype, user, status=status, sha256=sha256)
+        db.session.add(doc)
+        db.session.commit()
+        return doc
+    return make_document
+
+
+@pytest.fixture
+def make_task(app, board):
+    def make_task(title="Orientation", assigned_role="volunteer", classification="project"):
+        task = Task(classification, title, "", board, assigned_role=assigned_role)
+        db.session.add(task)
+        db.session.commit()
+        return task
+    return make_task
@@ -0,0 +1,90 @@
+from sqlalchemy import text
+from project import db
+from project.activity import activity_feed_page, log_event, resolve_targets
+from project.models import ActivityLog
+
+
+def log(actor, action="hours_created", target_type="Hours", target_id=1, at="2024-01-01 09:00:00"):
+    log_event(action=action, target_type=target_type, target_id=target_id, actor=actor)
+    db.session.flush()
+    # stored the way the CURRENT_TIMESTAMP default writes it
+    db.session.execute(
+        db.update(ActivityLog).where(ActivityLog.id == db.select(db.func.max(ActivityLog.id)).scalar_subquery())
+        .values(created_at=text(f"'{at}'"))
+    )
+    db.session.commit()
+
+
+def test_feed_is_newest_first_across_pages(board):
+    for day in range(1, 4):
+        for target_id in range(3):  # same second, so the id breaks ties
+            log(board, target_id=target_id, at=f"2024-01-0{day} 09:00:00")
+    expected = db.session.execute(
+        db.select(ActivityLog.id).order_by(ActivityLog.created_at.desc(), ActivityLog.id.desc())
+    ).scalars().all()
+
+    seen, cursor = [], None
+    while True:
+        page = activity_feed_page(cursor=cursor, limit=4)
+        seen += [entry.id for entry in page.items]
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert seen == expected
+
+
+def test_feed_filters(board, make_user):
+    volunteer = make_user()
+    log(board, action="task_created", target_type="Task")
+    log(volunteer, action="hours_created", target_type="Hours")
+    log(volunteer, action="document_uploaded", target_type="Document")
+
+    def actions(**filters):
+        return [entry.action for entry in activity_feed_page(**filters).items]
+
+    assert actions(action="task_created") == ["task_created"]
+    assert actions(target_type="Document") == ["document_uploaded"]
+    assert sorted(actions(actor_id=volunteer.id)) == ["document_uploaded", "hours_created"]
+
+
+def test_feed_loads_actors_in_one_query(board, make_user, count_queries):
+    for i in range(5):
+        log(make_user(f"Volunteer {i}"), target_id=i)
+    db.session.expunge_all()
+
+    with count_queries() as queries:
+        page = activity_feed_page()
+        names = {entry.actor.name for entry in page.items}
+    assert names == {f"Volunteer {i}" for i in range(5)}
+    assert len(queries) == 2
+
+
+def test_targets_resolved_per_type(board, make_user, make_hours, make_document, count_queries):
+    volunteer = make_user()
+    hours = [make_hours(volunteer) for _ in range(3)]
+    doc = make_document(volunteer)
+    for entry in hours:
+        log(board, action="hours_status_changed", target_type="Hours", target_id=entry.id)
+    log(board, action="document_status_changed", target_type="Document", target_id=doc.id)
+    log(board, action="user_role_changed", target_type="User", target_id=volunteer.id)
+    log(board, action="user_deleted", target_type="User", target_id=9999)
+    log(board, action="something_else", target_type="Unknown", target_id=1)
+    logs = activity_feed_page().items
+
+    with count_queries() as queries:
+        targets = resolve_targets(logs)
+    assert len(queries) == 3  # Hours, Document, User
+    assert {key: obj.id for key, obj in targets.items()} == {
+        **{("Hours", entry.id): entry.id for entry in hours},
+        ("Document", doc.id): doc.id,
+        ("User", volunteer.id): volunteer.id,
+    }
+
+
+def test_notification_page(board, login):
+    log(board, action="task_created", target_type="Task")
+    log(board, action="hours_created", target_type="Hours")
+    response = login(board).get("/notification?action=task_created")
+    assert response.status_code == 200
+    assert b'<h5 class="mb-1">Task created</h5>' in response.data
+    assert b'<h5 class="mb-1">Hours created</h5>' not in response.data
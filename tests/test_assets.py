@@ -0,0 +1,96 @@
+import gzip
+import json
+import os
+
+import pytest
+from project import assets
+from project.assets import asset_url, load_manifest, write_manifest
+
+CSS = b"body { color: #333; }\n" * 50
+
+
+@pytest.fixture
+def static_dir(app, tmp_path, monkeypatch):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "site.css").write_bytes(CSS)
+    (tmp_path / "avatars").mkdir()
+    (tmp_path / "avatars" / "default-thumb.webp").write_bytes(b"RIFF")
+    monkeypatch.setattr(app, "static_folder", str(tmp_path))
+    load_manifest()
+    yield tmp_path
+    monkeypatch.undo()
+    load_manifest()
+
+
+def test_manifest_fingerprints_static_files(static_dir, app):
+    assert list(assets._manifest) == ["css/site.css"]  # avatars are already content-addressed
+    with app.test_request_context():
+        url = asset_url("static", filename="css/site.css")
+        assert url.startswith("/assets/css/site.") and url.endswith(".css")
+        assert asset_url("static", filename="css/new.css") == "/static/css/new.css"
+
+    (static_dir / "css" / "site.css").write_bytes(CSS + b"a {}\n")
+    load_manifest()
+    with app.test_request_context():
+        assert asset_url("static", filename="css/site.css") != url
+
+
+def test_build_assets_precompresses(static_dir):
+    manifest = write_manifest()
+    assert json.loads((static_dir / "manifest.json").read_text()) == manifest
+    assert gzip.decompress((static_dir / "css" / "site.css.gz").read_bytes()) == CSS
+    if assets.brotli is not None:
+        assert assets.brotli.decompress((static_dir / "css" / "site.css.br").read_bytes()) == CSS
+
+
+def test_send_asset(static_dir, client):
+    write_manifest()
+    url = "/assets/" + assets._manifest["css/site.css"]
+
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert plain.status_code == 200 and plain.data == CSS
+    assert plain.content_encoding is None
+    assert plain.cache_control.public and plain.cache_control.immutable
+    assert plain.cache_control.max_age == 365 * 24 * 60 * 60
+    assert "Accept-Encoding" in plain.vary
+
+    zipped = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert zipped.content_encoding == "gzip"
+    assert gzip.decompress(zipped.data) == CSS
+    assert zipped.get_etag()[0] != plain.get_etag()[0]
+
+
+def test_stale_precompressed_copy_is_ignored(static_dir, client):
+    write_manifest()
+    url = "/assets/" + assets._manifest["css/site.css"]
+    for suffix in (".gz", ".br"):
+        path = static_dir / "css" / ("site.css" + suffix)
+        if path.exists():
+            os.utime(path, (0, 0))
+
+    response = client.get(url, headers={"Accept-Encoding": "gzip, br"})
+    assert response.content_encoding is None and response.data == CSS
+
+
+def test_unknown_fingerprint_is_404(static_dir, client):
+    assert client.get("/assets/css/site.0000000000.css").status_code == 404
+    assert client.get("/assets/css/site.css").status_code == 404
+
+
+def test_edited_file_is_not_served_under_its_old_name(static_dir, client):
+    url = "/assets/" + assets._manifest["css/site.css"]
+    site_css = static_dir / "css" / "site.css"
+
+    os.utime(site_css, ns=(0, 0))  # touched, same bytes
+    assert client.get(url).status_code == 200
+
+    site_css.write_bytes(CSS + b"a {}\n")
+    assert client.get(url).status_code == 404
+
+
+def test_stale_manifest_is_only_a_warning(static_dir, caplog):
+    write_manifest()
+    (static_dir / "css" / "site.css").write_bytes(CSS + b"a {}\n")
+    load_manifest()
+    assert "css/site.css" in caplog.text
+    assert assets._manifest != json.loads((static_dir / "manifest.json").read_text())
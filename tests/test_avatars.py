@@ -0,0 +1,79 @@
+import io
+import os
+
+import pytest
+from PIL import Image
+from project.avatars import AVATAR_VARIANTS, InvalidImage, avatar_filename, avatar_url, process_avatar
+
+
+@pytest.fixture
+def avatar_dir(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, "AVATAR_PATH", str(tmp_path))
+    return tmp_path
+
+
+def image_bytes(size=(800, 600), mode="RGB", fmt="JPEG", **save_args):
+    buffer = io.BytesIO()
+    Image.new(mode, size, "red").save(buffer, fmt, **save_args)
+    return buffer.getvalue()
+
+
+def test_variants_are_square_webp(avatar_dir):
+    exif = Image.Exif()
+    exif[0x010F] = "Secret Camera Co"
+    key = process_avatar(image_bytes(exif=exif.tobytes()))
+
+    assert sorted(os.listdir(avatar_dir)) == sorted(avatar_filename(key, variant) for variant in AVATAR_VARIANTS)
+    for variant, size in AVATAR_VARIANTS.items():
+        with Image.open(avatar_dir / avatar_filename(key, variant)) as variant_image:
+            assert (variant_image.format, variant_image.size) == ("WEBP", (size, size))
+            assert "exif" not in variant_image.info
+
+
+def test_same_picture_same_key(avatar_dir):
+    data = image_bytes(fmt="PNG", mode="RGBA")
+    key = process_avatar(data)
+    written = {name: os.path.getmtime(avatar_dir / name) for name in os.listdir(avatar_dir)}
+
+    assert process_avatar(data) == key
+    assert {name: os.path.getmtime(avatar_dir / name) for name in os.listdir(avatar_dir)} == written
+    assert process_avatar(image_bytes(fmt="PNG", mode="RGBA", size=(10, 10))) != key
+
+
+@pytest.mark.parametrize("data", [b"not an image", b""])
+def test_invalid_images(avatar_dir, data):
+    with pytest.raises(InvalidImage):
+        process_avatar(data)
+    assert os.listdir(avatar_dir) == []
+
+
+def test_huge_images_are_refused(avatar_dir, monkeypatch):
+    monkeypatch.setattr("project.avatars.MAX_AVATAR_PIXELS", 100)
+    with pytest.raises(InvalidImage):
+        process_avatar(image_bytes(size=(20, 20)))
+
+
+def test_avatar_url(app):
+    with app.test_request_context():
+        assert avatar_url("default.jpeg") == "/avatars/default-thumb.webp"
+        assert avatar_url("abc123", "medium") == "/avatars/abc123-medium.webp"
+        assert avatar_url("old.png") == "/static/profile_pics/old.png"
+
+
+def test_avatar_route_is_immutable(client):
+    response = client.get("/avatars/default-thumb.webp")
+    assert response.status_code == 200
+    assert response.cache_control.public and response.cache_control.immutable
+    assert response.cache_control.max_age == 365 * 24 * 60 * 60
+
+
+def test_profile_upload(avatar_dir, make_user, login):
+    user = make_user()
+    client = login(user)
+    data = {"name": user.name, "email": user.email, "picture": (io.BytesIO(image_bytes()), "me.jpg")}
+    client.post("/edit/profile", data=data, content_type="multipart/form-data")
+    assert user.picture == process_avatar(image_bytes())
+
+    data["picture"] = (io.BytesIO(b"garbage"), "me.jpg")
+    response = client.post("/edit/profile", data=data, content_type="multipart/form-data", follow_redirects=True)
+    assert b"could not be read as an image" in response.data
@@ -0,0 +1,195 @@
+import io
+import zipfile
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+from pypdf import PdfReader
+from project import db, certificates
+from project.certificates import CertificateCache, certificate_key, certificate_response, certificate_export_users, certificate_zip_stream
+
+
+@pytest.fixture
+def cache(app, monkeypatch):
+    cache = CertificateCache(max_bytes=8 * 1024 * 1024)
+    monkeypatch.setattr(certificates, "certificate_cache", cache)
+    return cache
+
+
+def respond(app, user, etag=None):
+    headers = {"If-None-Match": f'"{etag}"'} if etag else {}
+    with app.test_request_context(headers=headers):
+        return certificate_response(user, as_attachment=False, download_name="certificate.pdf")
+
+
+def test_etag_and_not_modified(app, make_user, cache):
+    user = make_user()
+    user.total_hours = 12.5
+    db.session.commit()
+
+    first = respond(app, user)
+    etag, _ = first.get_etag()
+    assert first.status_code == 200
+    assert first.mimetype == "application/pdf"
+    assert first.cache_control.private and first.cache_control.no_cache
+    assert cache.get(etag) is not None
+
+    repeat = respond(app, user, etag)
+    assert repeat.status_code == 304
+    assert repeat.get_etag()[0] == etag
+    assert not repeat.get_data()
+
+
+def test_changed_hours_change_the_etag(app, make_user, cache):
+    user = make_user()
+    etag, _ = respond(app, user).get_etag()
+
+    user.total_hours = 3.0
+    db.session.commit()
+
+    response = respond(app, user, etag)
+    assert response.status_code == 200
+    assert response.get_etag()[0] != etag
+    response.direct_passthrough = False
+    assert response.get_data().startswith(b"%PDF")
+
+
+def test_cache_evicts_least_recently_used():
+    cache = CertificateCache(max_bytes=10)
+    cache.put("1-a", b"aaaa")
+    cache.put("2-b", b"bbbb")
+    cache.get("1-a")
+    cache.put("3-c", b"cccc")
+    assert cache.get("2-b") is None
+    assert cache.get("1-a") == b"aaaa" and cache.get("3-c") == b"cccc"
+
+    cache.put("4-d", b"x" * 11)  # bigger than the whole cache: not kept
+    assert cache.get("4-d") is None
+
+
+def test_disk_cache_is_shared_and_invalidated(tmp_path):
+    worker_a = CertificateCache(max_bytes=1024, disk_dir=str(tmp_path))
+    worker_b = CertificateCache(max_bytes=1024, disk_dir=str(tmp_path))
+    worker_a.put("7-abc", b"%PDF 7")
+    worker_a.put("17-abc", b"%PDF 17")
+    assert worker_b.get("7-abc") == b"%PDF 7"
+
+    worker_b.invalidate_user(7)
+    assert worker_b.get("7-abc") is None
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["17-abc.pdf"]
+
+
+def test_issue_date_is_read_once(app, make_user, cache, monkeypatch):
+    user = make_user()
+    days = iter([date(2024, 1, 31), date(2024, 2, 1)])  # midnight strikes mid-request
+
+    class Clock(date):
+        @classmethod
+        def today(cls):
+            return next(days)
+
+    monkeypatch.setattr(certificates, "date", Clock)
+    response = respond(app, user)
+    assert response.get_etag()[0] == certificate_key(user, date(2024, 1, 31))
+    response.direct_passthrough = False
+    assert "Issued: January 31, 2024" in pdf_text(io.BytesIO(response.get_data()))
+
+
+def pdf_text(buffer):
+    page = PdfReader(buffer).pages[0]
+    return sorted(line.strip() for line in page.extract_text().splitlines() if line.strip())
+
+
+def test_template_matches_full_redraw(monkeypatch):
+    if certificates.certificate_template is None:
+        pytest.skip("CERTIFICATE_TEMPLATE is off")
+    user = SimpleNamespace(id=7, name="Ada Lovelace", total_hours=42.5, date_created=datetime(2023, 9, 1))
+
+    stamped = certificates.generate_volunteer_certificate(user)
+    monkeypatch.setattr(certificates, "certificate_template", None)
+    redrawn = certificates.generate_volunteer_certificate(user)
+
+    assert stamped.getvalue() != redrawn.getvalue()
+    assert pdf_text(stamped) == pdf_text(redrawn)
+    assert "Ada Lovelace" in pdf_text(stamped)
+    assert "42.5" in " ".join(pdf_text(stamped))
+
+
+def test_template_output_is_repeatable():
+    template = certificates.CertificateTemplate()
+    user = SimpleNamespace(id=7, name="Ada Lovelace", total_hours=42.5, date_created=datetime(2023, 9, 1))
+    first = certificates.generate_volunteer_certificate(user, template=template, issued=date(2024, 1, 1))
+    second = certificates.generate_volunteer_certificate(user, template=template, issued=date(2024, 1, 1))
+    assert first.getvalue() == second.getvalue()  # the cache key is a strong ETag
+    assert len(PdfReader(first).pages) == 1
+
+
+def test_template_stamps_are_independent():
+    first = SimpleNamespace(id=1, name="First Volunteer", total_hours=1.0, date_created=datetime(2023, 1, 1))
+    second = SimpleNamespace(id=2, name="Second Volunteer", total_hours=2.0, date_created=datetime(2023, 1, 1))
+    certificates.generate_volunteer_certificate(first)
+    text = pdf_text(certificates.generate_volunteer_certificate(second))
+    assert "Second Volunteer" in text
+    assert "First Volunteer" not in text
+
+
+@pytest.fixture
+def volunteers(make_user):
+    users = [make_user(name, role=role) for name, role in
+             [("Ada", "volunteer"), ("Grace", "intern"), ("Linus", "volunteer")]]
+    users[0].total_hours = 4.0
+    users[1].total_hours = 2.5
+    db.session.commit()
+    return users
+
+
+def test_export_users(volunteers):
+    ada, grace, linus = volunteers
+    assert [fields[:2] for fields in certificate_export_users()] == [(ada.id, "Ada"), (grace.id, "Grace")]
+    assert [fields[1] for fields in certificate_export_users("volunteer")] == ["Ada", "Linus"]
+
+
+@pytest.mark.parametrize("workers", [None, 1])
+def test_zip_stream_has_one_certificate_per_user(volunteers, workers):
+    users = certificate_export_users("volunteer")
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(certificate_zip_stream(users, workers=workers))))
+    names = archive.namelist()
+    assert names == [f"neopte_volunteer_certificate_{user_id:05d}_{name}.pdf" for user_id, name, _, _ in users]
+    for (_, name, _, _), filename in zip(users, names):
+        assert archive.getinfo(filename).compress_type == zipfile.ZIP_STORED
+        assert name in pdf_text(io.BytesIO(archive.read(filename)))
+
+
+@pytest.mark.parametrize("workers", ["0", "1"])
+def test_export_command(app, volunteers, tmp_path, workers):
+    output = tmp_path / "certificates.zip"
+    result = app.test_cli_runner().invoke(args=["export-certificates", "--output", str(output), "--workers", workers])
+    assert result.exit_code == 0, result.output
+    assert len(zipfile.ZipFile(output).namelist()) == 2
+
+
+def no_pool(*args, **kwargs):
+    raise AssertionError("web requests must not start worker processes")
+
+
+def test_abandoned_pool_is_shut_down(volunteers, monkeypatch):
+    pools = []
+
+    class Pool(certificates.ProcessPoolExecutor):
+        def shutdown(self, wait=True, cancel_futures=False):
+            pools.append(cancel_futures)
+            super().shutdown(wait=wait, cancel_futures=cancel_futures)
+
+    monkeypatch.setattr(certificates, "ProcessPoolExecutor", Pool)
+    stream = certificate_zip_stream(certificate_export_users("volunteer"), workers=1)
+    next(stream)
+    stream.close()  # client went away
+    assert pools == [True]
+
+
+def test_bulk_download(board, volunteers, login, monkeypatch):
+    monkeypatch.setattr(certificates, "ProcessPoolExecutor", no_pool)
+    response = login(board).get("/certificate/bulk?role=volunteer")
+    assert response.status_code == 200
+    assert response.headers["Content-Disposition"] == "attachment; filename=neopte_certificates_volunteer.zip"
+    assert len(zipfile.ZipFile(io.BytesIO(response.get_data())).namelist()) == 2
@@ -0,0 +1,97 @@
+import gzip
+import io
+import zlib
+
+import pytest
+from flask import send_file
+from project import compression
+from project.compression import compress_response
+
+BODY = b"<p>hello volunteers</p>\n" * 200
+
+
+@pytest.fixture
+def compress(app):
+    def compress(response, accept="gzip"):
+        with app.test_request_context(headers={"Accept-Encoding": accept}):
+            return compress_response(response)
+    return compress
+
+
+def html(app, body=BODY, **kwargs):
+    return app.response_class(body, mimetype="text/html", **kwargs)
+
+
+def test_gzips_html(app, compress):
+    response = html(app)
+    response.set_etag("abc")
+    response = compress(response)
+
+    assert response.content_encoding == "gzip"
+    assert gzip.decompress(response.get_data()) == BODY
+    assert response.content_length == len(response.get_data())
+    assert "Accept-Encoding" in response.vary
+    assert response.get_etag() == ("abc.gzip", False)
+
+
+@pytest.mark.skipif(compression.brotli is None, reason="brotli not installed")
+def test_prefers_brotli(app, compress):
+    response = compress(html(app), accept="gzip, br")
+    assert response.content_encoding == "br"
+    assert compression.brotli.decompress(response.get_data()) == BODY
+
+
+def test_identity_still_varies(app, compress):
+    response = compress(html(app), accept="identity")
+    assert response.content_encoding is None
+    assert response.get_data() == BODY
+    assert "Accept-Encoding" in response.vary
+
+
+def test_small_bodies_are_left_alone(app, compress):
+    response = compress(html(app, b"<p>hi</p>"))
+    assert response.content_encoding is None and response.get_data() == b"<p>hi</p>"
+
+
+def test_skips_already_encoded(app, compress):
+    encoded = gzip.compress(BODY)
+    response = html(app, encoded)
+    response.content_encoding = "gzip"
+    response = compress(response, accept="gzip, br")
+    assert response.get_data() == encoded
+    assert "Accept-Encoding" not in response.vary
+
+
+def test_skips_other_mimetypes_and_statuses(app, compress):
+    assert compress(app.response_class(BODY, mimetype="application/pdf")).content_encoding is None
+    assert compress(html(app, status=304)).content_encoding is None
+    no_transform = html(app)
+    no_transform.cache_control.no_transform = True
+    assert compress(no_transform).content_encoding is None
+
+
+def test_skips_files(app, compress):
+    with app.test_request_context():
+        response = send_file(io.BytesIO(BODY), mimetype="text/html")
+    response = compress(response)
+    assert response.content_encoding is None
+    assert response.direct_passthrough
+
+
+def test_streamed_responses_are_compressed_per_chunk(app, compress):
+    chunks = [b"<tr><td>row</td></tr>\n" * 100, b"", b"</table>"]
+    response = compress(html(app, iter(chunks), headers={"Content-Length": "9999"}))
+    assert response.content_encoding == "gzip"
+    assert "Content-Length" not in response.headers
+
+    parts = list(response.response)
+    # each chunk is flushed, so the first one can be decoded on its own
+    assert zlib.decompressobj(31).decompress(parts[0]) == chunks[0]
+    assert gzip.decompress(b"".join(parts)) == b"".join(chunks)
+
+
+def test_pages_are_compressed(client):
+    response = client.get("/login", headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.content_encoding == "gzip"
+    assert b"<html" in gzip.decompress(response.data).lower()
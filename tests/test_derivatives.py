@@ -0,0 +1,136 @@
+import hashlib
+import io
+import os
+
+import pikepdf
+import pytest
+from reportlab.pdfgen import canvas
+from werkzeug.datastructures import FileStorage
+from project import app as flask_app, db
+from project.derivatives import optimize_document, optimize_documents, unoptimized_document_ids
+from project.uploads import blob_path, release_blobs, stage_upload
+
+
+@pytest.fixture
+def store(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, "UPLOAD_PATH", str(tmp_path))
+    monkeypatch.setitem(app.config, "BLOB_PATH", str(tmp_path / "blobs"))
+    return tmp_path
+
+
+def pdf_bytes(pages=3):
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for n in range(pages):
+        pdf.drawString(72, 720, f"Page {n + 1}")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def stored_document(store, board, make_document):
+    def stored_document(data):
+        staged = stage_upload(FileStorage(io.BytesIO(data), "form.pdf"), str(store), 1024 * 1024)
+        staged.commit(blob_path(staged.sha256))
+        return make_document(board, sha256=staged.sha256)
+    return stored_document
+
+
+def test_web_copy_is_linearized(stored_document):
+    data = pdf_bytes()
+    doc = stored_document(data)
+    assert unoptimized_document_ids() == [doc.id]
+
+    optimize_documents([doc.id])
+    assert unoptimized_document_ids() == []
+    assert doc.size == len(data)
+    assert doc.web_sha256 != doc.sha256
+    with open(blob_path(doc.web_sha256), "rb") as f:
+        web = f.read()
+    assert (len(web), hashlib.sha256(web).hexdigest()) == (doc.web_size, doc.web_sha256)
+    with pikepdf.open(blob_path(doc.web_sha256)) as pdf:
+        assert pdf.is_linearized and len(pdf.pages) == 3
+    with open(blob_path(doc.sha256), "rb") as f:
+        assert f.read() == data  # original untouched
+
+
+def test_identical_uploads_share_the_web_copy(stored_document, store, monkeypatch):
+    data = pdf_bytes()
+    first = stored_document(data)
+    optimize_document(first)
+    db.session.commit()
+
+    monkeypatch.setattr("project.derivatives.optimize_pdf", lambda *args, **kwargs: pytest.fail("re-optimised"))
+    second = stored_document(data)
+    optimize_document(second)
+    assert (second.web_sha256, second.web_size) == (first.web_sha256, first.web_size)
+
+
+def test_unreadable_pdf_serves_the_original(stored_document, store):
+    doc = stored_document(b"%PDF-1.4 not really a pdf")
+    optimize_document(doc)
+    assert (doc.web_sha256, doc.web_size) == (doc.sha256, doc.size)
+    assert [name for name in os.listdir(store) if name.startswith(".web-")] == []
+
+
+def test_fresh_web_copy_survives_until_committed(stored_document, monkeypatch):
+    doc = stored_document(pdf_bytes())
+    optimize_document(doc)
+    web_path = blob_path(doc.web_sha256)
+    db.session.rollback()  # as seen from another worker: nothing references the copy yet
+    release_blobs([os.path.basename(web_path)])
+    assert os.path.exists(web_path)
+
+    monkeypatch.setattr("project.uploads.BLOB_GRACE_SECONDS", 0)
+    release_blobs([os.path.basename(web_path)])
+    assert not os.path.exists(web_path)
+
+
+def test_reused_web_copy_is_claimed(stored_document):
+    data = pdf_bytes()
+    first = stored_document(data)
+    optimize_documents([first.id])
+    web_path = blob_path(first.web_sha256)
+    os.utime(web_path, (0, 0))  # long past its grace period
+
+    second = stored_document(data)
+    optimize_document(second)
+    assert second.web_sha256 == first.web_sha256
+    db.session.rollback()  # as seen from another worker deleting the first document
+    db.session.delete(first)
+    db.session.commit()
+    release_blobs([os.path.basename(web_path)])
+    assert os.path.exists(web_path)
+
+
+def test_one_failure_does_not_stop_the_batch(stored_document, monkeypatch):
+    docs = [stored_document(pdf_bytes(pages)) for pages in (1, 2, 3)]
+    real_optimize = optimize_document
+
+    def flaky_optimize(doc):
+        real_optimize(doc)
+        if doc.id == docs[1].id:
+            raise RuntimeError("disk full")
+
+    monkeypatch.setattr("project.derivatives.optimize_document", flaky_optimize)
+    assert optimize_documents([doc.id for doc in docs]) == [docs[1].id]
+    assert unoptimized_document_ids() == [docs[1].id]  # rolled back
+
+    result = flask_app.test_cli_runner().invoke(args=["optimize-documents"])
+    assert "Optimized 0 documents" in result.output and f"Failed: {docs[1].id}" in result.output
+
+
+def test_view_pdf_prefers_the_web_copy(stored_document, board, login):
+    data = pdf_bytes()
+    doc = stored_document(data)
+    optimize_documents([doc.id])
+    client = login(board)
+
+    web = client.get(f"/view/{doc.id}")
+    assert web.get_etag() == (doc.web_sha256, False)
+    assert len(web.data) == doc.web_size
+
+    original = client.get(f"/view/{doc.id}?original=1")
+    assert original.get_etag() == (doc.sha256, False)
+    assert original.data == data
@@ -0,0 +1,135 @@
+from project import app as flask_app, db
+from project.hours import change_hours_status, change_hours_statuses, fix_hours_drift, hours_drift, total_hours_delta
+from project.models import ActivityLog, Hours, User
+
+
+def total_hours(user):
+    return db.session.scalar(db.select(User.total_hours).where(User.id == user.id))
+
+
+def set_total(user, amount):
+    db.session.execute(db.update(User).where(User.id == user.id).values(total_hours=amount))
+    db.session.commit()
+
+
+def test_total_hours_delta():
+    assert total_hours_delta("Pending", "Approved", 2.0) == 2.0
+    assert total_hours_delta("Approved", "Denied", 2.0) == -2.0
+    assert total_hours_delta("Denied", "Pending", 2.0) == 0.0
+    assert total_hours_delta("Approved", "Approved", 2.0) == 0.0
+
+
+def test_single_change_reports_no_op(board, make_user, make_hours):
+    user = make_user()
+    log = make_hours(user, 2.0)
+    assert change_hours_status(log.id, "Approved", board) == (user.id, "Pending")
+    assert change_hours_status(log.id, "Approved", board) is None
+    assert change_hours_status(-1, "Approved", board) is None
+    db.session.commit()
+
+    assert total_hours(user) == 2.0
+    assert db.session.scalar(db.select(db.func.count()).select_from(ActivityLog)) == 1
+    assert change_hours_status(log.id, "Pending", board) == (user.id, "Approved")
+    db.session.commit()
+    assert total_hours(user) == 0.0
+
+
+def test_approving_twice_counts_hours_once(board, make_user, make_hours):
+    user = make_user()
+    logs = [make_hours(user, amount) for amount in (1.5, 2.0)]
+    ids = [log.id for log in logs]
+
+    changed = change_hours_statuses(ids + ids, "Approved", board)
+    db.session.commit()
+    assert sorted(changed) == [(log_id, user.id, "Pending") for log_id in sorted(ids)]
+    assert total_hours(user) == 3.5
+
+    assert change_hours_statuses(ids, "Approved", board) == []
+    db.session.commit()
+    assert total_hours(user) == 3.5
+    assert db.session.scalar(db.select(db.func.count()).select_from(ActivityLog)) == 2
+    assert hours_drift() == []
+
+
+def test_denying_approved_hours_takes_them_back(board, make_user, make_hours):
+    user = make_user()
+    approved = make_hours(user, 4.0)
+    pending = make_hours(user, 1.0)
+    change_hours_statuses([approved.id], "Approved", board)
+    db.session.commit()
+
+    changed = change_hours_statuses([approved.id, pending.id], "Denied", board)
+    db.session.commit()
+    assert sorted(changed) == sorted([(approved.id, user.id, "Approved"), (pending.id, user.id, "Pending")])
+    assert total_hours(user) == 0.0
+    assert hours_drift() == []
+
+
+def test_bulk_route(board, make_user, make_hours, login):
+    ada, grace = make_user("Ada"), make_user("Grace")
+    logs = [make_hours(ada, 1.0), make_hours(ada, 2.0), make_hours(grace, 4.0, status="Approved")]
+    client = login(board)
+
+    response = client.post("/hours/bulk_status", json={"log_ids": [log.id for log in logs] + ["x"], "new_status": "Approved"})
+    assert response.get_json() == {"updated": [logs[0].id, logs[1].id], "unchanged": [logs[2].id], "new_status": "Approved"}
+    assert total_hours(ada) == 3.0
+
+    response = client.post("/hours/bulk_status", data={"log_id": [logs[0].id], "new_status": "Denied"})
+    assert response.status_code == 302
+    assert total_hours(ada) == 2.0
+
+
+def test_bulk_route_rejects_bad_requests(board, make_user, make_hours, login, monkeypatch):
+    log = make_hours(make_user())
+    client = login(board)
+    assert client.post("/hours/bulk_status", json={"log_ids": [log.id], "new_status": "Bogus"}).status_code == 400
+    assert client.post("/hours/bulk_status", json={"log_ids": [], "new_status": "Approved"}).get_json() == {"error": "No hours selected."}
+
+    monkeypatch.setattr("app.MAX_BULK_HOURS", 1)
+    response = client.post("/hours/bulk_status", json={"log_ids": [log.id, log.id + 1], "new_status": "Approved"})
+    assert response.status_code == 400
+    assert db.session.get(Hours, log.id).status == "Pending"
+
+
+def test_route_approves_once(board, make_user, make_hours, login):
+    user = make_user()
+    log = make_hours(user, 3.0)
+    client = login(board)
+    for _ in range(2):
+        response = client.post("/hours/log/update_status/", data={"log_id": log.id, "new_status": "Approved"})
+        assert response.status_code == 302
+    assert total_hours(user) == 3.0
+
+    client.post("/hours/log/update_status/", data={"log_id": log.id, "new_status": "Bogus"})
+    assert total_hours(user) == 3.0
+
+
+def test_drift_is_found_and_fixed(make_user, make_hours):
+    fine, drifted, empty = make_user("Fine"), make_user("Drifted"), make_user("Empty")
+    for user, amounts in ((fine, (1.5, 2.5)), (drifted, (4.0,))):
+        for amount in amounts:
+            make_hours(user, amount, status="Approved")
+    make_hours(drifted, 10.0, status="Pending")
+    set_total(fine, 4.0)
+    set_total(drifted, 14.0)
+    set_total(empty, 1.0)
+
+    assert hours_drift() == [(drifted.id, "Drifted", 14.0, 4.0), (empty.id, "Empty", 1.0, 0.0)]
+    fix_hours_drift([drifted.id, empty.id])
+    db.session.commit()
+    assert hours_drift() == []
+    assert (total_hours(drifted), total_hours(empty)) == (4.0, 0.0)
+
+
+def test_reconcile_hours_command(make_user, make_hours):
+    user = make_user("Drifted")
+    make_hours(user, 2.0, status="Approved")
+    runner = flask_app.test_cli_runner()
+
+    result = runner.invoke(args=["reconcile-hours"])
+    assert "Drifted" in result.output and "1 users drifted" in result.output
+    assert total_hours(user) == 0.0
+
+    result = runner.invoke(args=["reconcile-hours", "--fix"])
+    assert "1 users drifted, fixed" in result.output
+    assert total_hours(user) == 2.0
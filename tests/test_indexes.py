@@ -0,0 +1,33 @@
+import pytest
+from sqlalchemy import text
+from project import db
+from project.models import ActivityLog, Document, Hours, TaskAssignment, User
+
+
+def plan(statement):
+    sql = statement.compile(db.engine, compile_kwargs={"literal_binds": True})
+    return " | ".join(row[-1] for row in db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+
+@pytest.mark.parametrize("statement, index", [
+    (db.select(Hours).where(Hours.status == "Pending").order_by(Hours.date, Hours.id),
+     "ix_hours_status_date"),
+    (db.select(Hours).where(Hours.user_id == 42, Hours.status == "Approved"),
+     "ix_hours_user_id_status"),
+    (db.select(Document).where(Document.status == "Pending").order_by(Document.uploaded_at, Document.id),
+     "ix_documents_status_uploaded_at"),
+    (db.select(Document).where(Document.user_id == 42, Document.status == "Pending"),
+     "ix_documents_user_id_status"),
+    (db.select(ActivityLog).order_by(ActivityLog.created_at.desc()).limit(100),
+     "ix_activity_logs_created_at"),
+    (db.select(ActivityLog).where(ActivityLog.actor_id == 42).order_by(ActivityLog.created_at.desc()).limit(100),
+     "ix_activity_logs_actor_id_created_at"),
+    (db.select(TaskAssignment).where(TaskAssignment.user_id == 42).order_by(TaskAssignment.due_date),
+     "ix_task_assignments_user_id_due_date"),
+    (db.select(User.id).where(User.role == "intern"),
+     "ix_users_role"),
+])
+def test_hot_queries_use_their_index(app, statement, index):
+    query_plan = plan(statement)
+    assert index in query_plan
+    assert "TEMP B-TREE" not in query_plan  # no sort step either
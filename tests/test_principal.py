@@ -0,0 +1,84 @@
+import time
+
+from project import db
+from project.models import User
+from project.principal import Principal, UserCache
+
+
+def set_role(user, role):
+    # change the row behind the caches' back, as another worker would
+    db.session.execute(db.update(User).where(User.id == user.id).values(role=role))
+    db.session.commit()
+
+
+def test_cached_until_invalidated(make_user, tmp_path):
+    user = make_user(role="volunteer")
+    cache = UserCache(ttl=300, versions_dir=str(tmp_path))
+
+    principal = cache.load(user.id)
+    assert isinstance(principal, Principal)
+    assert (principal.id, principal.name, principal.role) == (user.id, user.name, "volunteer")
+    assert principal.email == user.email  # falls back to the full row
+
+    set_role(user, "board")
+    assert cache.load(user.id).role == "volunteer"
+
+    cache.invalidate(user.id)
+    assert cache.load(user.id).role == "board"
+
+
+def test_invalidation_reaches_other_workers(make_user, tmp_path):
+    user = make_user(role="board")
+    worker_a = UserCache(ttl=300, versions_dir=str(tmp_path))
+    worker_b = UserCache(ttl=300, versions_dir=str(tmp_path))
+    assert worker_a.load(user.id).role == "board"
+
+    set_role(user, "volunteer")
+    worker_b.invalidate(user.id)
+    assert worker_a.load(user.id).role == "volunteer"
+
+
+def test_entries_expire(make_user, tmp_path, monkeypatch):
+    user = make_user(role="board")
+    cache = UserCache(ttl=60, versions_dir=str(tmp_path))
+    cache.load(user.id)
+    set_role(user, "volunteer")
+
+    later = time.monotonic() + 61
+    monkeypatch.setattr("project.principal.time.monotonic", lambda: later)
+    assert cache.load(user.id).role == "volunteer"
+
+
+def test_deleted_user(make_user, tmp_path):
+    user = make_user()
+    cache = UserCache(ttl=300, versions_dir=str(tmp_path))
+    cache.load(user.id)
+
+    db.session.delete(user)
+    db.session.commit()
+    cache.invalidate(user.id)
+    assert cache.load(user.id) is None
+
+
+def test_requests_use_the_cache(make_user, login, count_queries, monkeypatch, tmp_path):
+    monkeypatch.setattr("project.principal.user_cache", UserCache(ttl=300, versions_dir=str(tmp_path)))
+    user = make_user(role="volunteer")
+    login(user).get("/tasks/status")
+
+    client = login(user)
+    db.session.expunge_all()  # the test's session would otherwise hand back the same User
+    with count_queries() as queries:
+        assert client.get("/tasks/status").status_code == 200
+    assert not any("FROM users" in statement for statement in queries)
+
+
+def test_disabled_cache_writes_nothing(make_user, tmp_path):
+    user = make_user(role="volunteer")
+    versions_dir = tmp_path / "versions"
+    cache = UserCache(ttl=0, versions_dir=str(versions_dir))
+
+    cache.load(user.id)
+    set_role(user, "board")
+    assert cache.load(user.id).role == "board"
+    cache.invalidate(user.id)
+    assert not versions_dir.exists()
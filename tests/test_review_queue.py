@@ -0,0 +1,138 @@
+from datetime import date
+
+from sqlalchemy import text
+from project import db
+from project.models import ActivityLog, Document
+from project.review_queue import pending_hours_page, pending_documents_page, change_document_statuses
+
+
+def test_pending_hours_oldest_first(make_user, make_hours):
+    user = make_user()
+    newer = make_hours(user, day=date(2024, 2, 1))
+    older = make_hours(user, day=date(2024, 1, 1))
+    make_hours(user, day=date(2023, 1, 1), status="Approved")
+
+    page = pending_hours_page()
+    assert [log.id for log in page.items] == [older.id, newer.id]
+    assert page.items[0].user.name == user.name
+    assert page.next_cursor is None
+
+
+def test_pending_hours_json_pages(board, make_hours, login):
+    client = login(board)
+    ids = [make_hours(board, day=date(2024, 1, day)).id for day in range(1, 6)]
+
+    seen, url = [], "/pending/hours/json?limit=2"
+    while url:
+        data = client.get(url).get_json()
+        assert len(data["items"]) <= 2
+        seen += [item["id"] for item in data["items"]]
+        url = data["next_cursor"] and f"/pending/hours/json?limit=2&cursor={data['next_cursor']}"
+    assert seen == ids
+
+
+def test_pending_hours_needs_board(make_user, login):
+    client = login(make_user(role="volunteer"))
+    response = client.get("/pending/hours/json")
+    assert response.status_code == 302
+
+
+def test_pending_hours_page_keeps_its_size(board, make_hours, login):
+    for day in range(1, 4):
+        make_hours(board, day=date(2024, 1, day))
+    response = login(board).get("/pending/hours?limit=2")
+    assert response.status_code == 200
+    assert b"/pending/hours?limit=2&amp;cursor=" in response.data
+
+
+def uploaded(doc, when):
+    # stored the way the CURRENT_TIMESTAMP default writes it
+    db.session.execute(db.update(Document).where(Document.id == doc.id).values(uploaded_at=text(f"'{when}'")))
+    db.session.commit()
+
+
+def test_pending_documents_filters(make_user, make_document):
+    alice, bob = make_user("Alice"), make_user("Bob")
+    jan = make_document(alice)
+    feb = make_document(alice, doctype="image/png")
+    bob_feb = make_document(bob)
+    make_document(bob, status="Approved")
+    uploaded(jan, "2024-01-31 23:59:59")
+    uploaded(feb, "2024-02-01 00:00:00")
+    uploaded(bob_feb, "2024-02-10 12:00:00")
+
+    def ids(**filters):
+        return [doc.id for doc in pending_documents_page(**filters).items]
+
+    assert ids() == [jan.id, feb.id, bob_feb.id]
+    assert ids(doctype="image/png") == [feb.id]
+    assert ids(user_id=bob.id) == [bob_feb.id]
+    # since/until are whole days, both inclusive
+    assert ids(since=date(2024, 2, 1)) == [feb.id, bob_feb.id]
+    assert ids(until=date(2024, 1, 31)) == [jan.id]
+    assert ids(since=date(2024, 2, 1), until=date(2024, 2, 9)) == [feb.id]
+
+
+def test_pending_documents_same_second(make_user, make_document):
+    user = make_user()
+    docs = [make_document(user) for _ in range(5)]
+    for doc in docs:
+        uploaded(doc, "2024-03-01 09:00:00")
+
+    first = pending_documents_page(limit=3)
+    second = pending_documents_page(cursor=first.next_cursor, limit=3)
+    assert [doc.id for doc in first.items + second.items] == [doc.id for doc in docs]
+    assert second.next_cursor is None
+
+
+def test_pending_documents_json(board, make_document, login):
+    docs = [make_document(board), make_document(board, doctype="text/plain")]
+    data = login(board).get("/pending/documents/json?doctype=text/plain").get_json()
+    assert [item["id"] for item in data["items"]] == [docs[1].id]
+    assert data["items"][0]["user_name"] == board.name
+
+
+def test_results_per_document(board, make_user, make_document):
+    user = make_user()
+    pending = make_document(user)
+    approved = make_document(user, status="Approved")
+    denied = make_document(user, status="Denied")
+
+    results = change_document_statuses([pending.id, approved.id, denied.id, pending.id, 9999], "Approved", board)
+    db.session.commit()
+
+    assert results == {
+        pending.id: "updated",
+        approved.id: "unchanged",
+        denied.id: "updated",
+        9999: "not_found",
+    }
+    statuses = db.session.execute(db.select(Document.id, Document.status)).all()
+    assert all(status == "Approved" for _, status in statuses)
+
+    logged = db.session.execute(db.select(ActivityLog.target_id, ActivityLog.details)).all()
+    assert sorted(logged) == sorted([
+        (pending.id, {"old_status": "Pending", "new_status": "Approved"}),
+        (denied.id, {"old_status": "Denied", "new_status": "Approved"}),
+    ])
+
+
+def test_no_ids(board):
+    assert change_document_statuses([], "Approved", board) == {}
+
+
+def test_bulk_document_route(board, make_user, make_document, login):
+    user = make_user()
+    pending, approved = make_document(user), make_document(user, status="Approved")
+    client = login(board)
+
+    response = client.post("/documents/bulk_status", json={"doc_ids": [pending.id, approved.id, 9999], "new_status": "Approved"})
+    assert response.get_json() == {
+        "new_status": "Approved",
+        "results": {str(pending.id): "updated", str(approved.id): "unchanged", "9999": "not_found"},
+    }
+    assert client.post("/documents/bulk_status", json={"doc_ids": [pending.id], "new_status": "Lost"}).status_code == 400
+
+    response = client.post("/documents/bulk_status", data={"doc_id": [pending.id], "new_status": "Denied"})
+    assert response.status_code == 302
+    assert db.session.get(Document, pending.id).status == "Denied"
@@ -0,0 +1,96 @@
+import os
+
+import pytest
+from reportlab.pdfgen import canvas
+
+from project import db
+from project.models import Document
+from project.search import match_expression, index_documents, search_documents, unindex_documents, unindexed_document_ids
+
+
+def test_match_expression():
+    assert match_expression("eval") == '"eval"*'
+    assert match_expression('tax  "form" OR') == '"tax" "form" "OR"*'
+    assert match_expression("NEAR(a b)") == '"NEAR" "a" "b"*'
+    assert match_expression("  -*: ") is None
+    assert match_expression(None) is None
+
+
+@pytest.fixture
+def add_pdf(app, tmp_path, monkeypatch, make_user):
+    monkeypatch.setitem(app.config, "UPLOAD_PATH", str(tmp_path))
+    owner = make_user()
+
+    def add_pdf(filename, body, description="No description provided"):
+        pdf = canvas.Canvas(str(tmp_path / filename))
+        pdf.drawString(72, 720, body)
+        pdf.save()
+        doc = Document(filename, "application/pdf", owner, description=description)
+        db.session.add(doc)
+        db.session.commit()
+        return doc
+    return add_pdf
+
+
+def test_search_ranks_and_highlights(add_pdf):
+    body_hit = add_pdf("letter.pdf", "Quarterly volunteer evaluation")
+    title_hit = add_pdf("evaluation.pdf", "Nothing to see here")
+    other = add_pdf("other.pdf", "Unrelated text")
+    assert unindexed_document_ids() == [body_hit.id, title_hit.id, other.id]
+    index_documents(unindexed_document_ids())
+    assert unindexed_document_ids() == []
+
+    page = search_documents("evalu")
+    assert [hit["id"] for hit in page.items] == [title_hit.id, body_hit.id]
+    assert page.next_cursor is None
+    assert "<mark>evaluation</mark>" in page.items[1]["snippet"]
+    assert page.items[0]["user_name"] == "Volunteer"
+
+
+def test_snippets_are_escaped(add_pdf):
+    doc = add_pdf("notes.pdf", "<b>budget</b> & plans")
+    index_documents([doc.id])
+    (hit,) = search_documents("budget").items
+    assert "&lt;b&gt;<mark>budget</mark>" in hit["snippet"]
+
+
+def test_search_pages_by_offset(add_pdf):
+    docs = [add_pdf(f"minutes-{n}.pdf", "Board meeting minutes") for n in range(3)]
+    index_documents([doc.id for doc in docs])
+
+    first = search_documents("minutes", limit=2)
+    second = search_documents("minutes", cursor=first.next_cursor, limit=2)
+    assert len(first.items) == 2 and len(second.items) == 1
+    assert second.next_cursor is None
+    assert {hit["id"] for hit in first.items + second.items} == {doc.id for doc in docs}
+
+
+def test_unindexed_and_missing_files(add_pdf, app):
+    doc = add_pdf("gone.pdf", "whatever", description="Signed waiver")
+    os.remove(os.path.join(app.config["UPLOAD_PATH"], "gone.pdf"))
+    index_documents([doc.id])
+    assert [hit["id"] for hit in search_documents("waiver").items] == [doc.id]
+
+    unindex_documents([doc.id])
+    db.session.commit()
+    assert search_documents("waiver").items == []
+    assert unindexed_document_ids() == [doc.id]
+
+
+def test_search_route(add_pdf, board, login):
+    doc = add_pdf("roster.pdf", "Spring tutoring roster")
+    index_documents([doc.id])
+    client = login(board)
+
+    assert client.get("/documents/search?q=roster").status_code == 200
+    data = client.get("/documents/search/json?q=tutor").get_json()
+    assert [item["id"] for item in data["items"]] == [doc.id]
+    assert "<mark>tutoring</mark>" in data["items"][0]["snippet"]
+
+
+def test_search_page_keeps_its_size(add_pdf, board, login):
+    docs = [add_pdf(f"roster{n}.pdf", "Spring tutoring roster") for n in range(3)]
+    index_documents([doc.id for doc in docs])
+    response = login(board).get("/documents/search?q=roster&limit=2")
+    assert response.status_code == 200
+    assert b"/documents/search?q=roster&amp;limit=2&amp;cursor=" in response.data
@@ -0,0 +1,185 @@
+from datetime import date, datetime
+
+import pytest
+
+from project import db
+from project.models import ActivityLog, TaskAssignment, User
+from project.tasks import assign_task, bucketed_assignments, fan_out_statement, role_recipients, task_bucket, task_overview_page
+
+DUE = datetime(2030, 1, 1, 17, 0)
+
+
+def assignments():
+    return db.session.execute(
+        db.select(TaskAssignment.task_id, TaskAssignment.user_id, TaskAssignment.due_date,
+                  TaskAssignment.status, TaskAssignment.upload, TaskAssignment.comments)
+        .order_by(TaskAssignment.user_id)
+    ).all()
+
+
+def test_assign_to_whole_role(board, make_user, make_task, count_queries):
+    ada, linus = make_user("Ada"), make_user("Linus")
+    make_user("Grace", role="intern")
+    task = make_task(assigned_role="volunteer")
+
+    with count_queries() as queries:
+        assert assign_task(task, DUE, True, actor=board) == 2
+    db.session.commit()
+
+    assert assignments() == [(task.id, ada.id, DUE, "pending", True, ""), (task.id, linus.id, DUE, "pending", True, "")]
+    (insert,) = [statement for statement in queries if statement.startswith("INSERT")]
+    assert insert.startswith("INSERT INTO task_assignments") and "SELECT" in insert  # users never loaded
+    log = db.session.execute(db.select(ActivityLog)).scalar_one()
+    assert (log.action, log.target_id, log.details["assigned_count"]) == ("task_assigned", task.id, 2)
+
+
+def test_specific_users_skip_unknown_ids(board, make_user, make_task):
+    ada = make_user("Ada")
+    task = make_task(assigned_role="specific")
+
+    assert assign_task(task, DUE, False, actor=board, user_ids=[ada.id, 9999]) == 1
+    assert assign_task(make_task(assigned_role="specific"), DUE, False, actor=board, user_ids=[9999]) == 0
+    db.session.commit()
+    assert [row.user_id for row in assignments()] == [ada.id]
+
+
+def test_fan_out_statement_with_no_matches(make_task):
+    task = make_task()
+    statement = fan_out_statement(task.id, db.select(User.id).where(User.role == "nobody"), DUE, False)
+    assert db.session.execute(statement).rowcount == 0
+
+
+def test_role_recipients(make_user):
+    for name in ("Zed", "Ada", "Mia"):
+        make_user(name)
+    make_user("Board", role="board")
+    count, preview = role_recipients("volunteer", limit=2)
+    assert count == 3
+    assert [user.name for user in preview] == ["Ada", "Mia"]
+
+
+WEDNESDAY = date(2024, 1, 10)  # its week starts Monday 8 January
+
+
+@pytest.fixture
+def assign(make_task):
+    task = make_task()
+
+    def assign(user, due_date, status="pending"):
+        assignment = TaskAssignment(task, user, due_date, status=status)
+        db.session.add(assignment)
+        db.session.commit()
+        return assignment
+    return assign
+
+
+def bucket_of(assignment, today):
+    return db.session.scalar(db.select(task_bucket(today)).where(TaskAssignment.id == assignment.id))
+
+
+@pytest.mark.parametrize("today, due_date, status, bucket", [
+    (WEDNESDAY, datetime(2024, 1, 9, 12), "pending", "overdue"),
+    (WEDNESDAY, datetime(2024, 1, 9, 12), "done", "this_week"),      # finished, still shown in its week
+    (WEDNESDAY, datetime(2024, 1, 1), "graded", "later"),            # finished in a past week
+    (WEDNESDAY, datetime(2024, 1, 10, 0, 0), "pending", "this_week"),  # due today isn't overdue
+    (WEDNESDAY, datetime(2024, 1, 14, 23, 59), "pending", "this_week"),
+    (WEDNESDAY, datetime(2024, 1, 15, 0, 0), "pending", "next_week"),
+    (WEDNESDAY, datetime(2024, 1, 21, 23, 59), "pending", "next_week"),
+    (WEDNESDAY, datetime(2024, 1, 22, 0, 0), "pending", "later"),
+    (date(2024, 1, 8), datetime(2024, 1, 7, 23, 59), "pending", "overdue"),
+    (date(2024, 1, 8), datetime(2024, 1, 7, 23, 59), "done", "later"),  # Sunday belongs to last week
+    (date(2024, 1, 14), datetime(2024, 1, 8, 9), "done", "this_week"),
+])
+def test_task_bucket_edges(make_user, assign, today, due_date, status, bucket):
+    assert bucket_of(assign(make_user(), due_date, status), today) == bucket
+
+
+def test_bucketed_assignments(make_user, assign, count_queries):
+    user, other = make_user("Ada"), make_user("Linus")
+    later = [assign(user, datetime(2024, 3, day)) for day in (3, 1, 2)]
+    overdue = assign(user, datetime(2024, 1, 2))
+    this_week = assign(user, datetime(2024, 1, 11))
+    assign(other, datetime(2024, 1, 2))
+    user_id = user.id
+
+    with count_queries() as queries:
+        buckets = bucketed_assignments(user_id, limit=2, today=WEDNESDAY)
+        titles = [assignment.task.title for section in buckets for assignment in section["assignments"]]
+    assert len(queries) == 1  # tasks come with the assignments
+    assert titles == ["Orientation"] * 4
+
+    assert [(section["bucket"], section["total"]) for section in buckets] == [("overdue", 1), ("this_week", 1), ("later", 3)]
+    assert buckets[0]["assignments"] == [overdue]
+    assert buckets[1]["assignments"] == [this_week]
+    assert buckets[2]["assignments"] == [later[1], later[2]]  # first two by due date
+
+
+def test_no_assignments(make_user):
+    assert bucketed_assignments(make_user().id) == []
+
+
+def test_task_list_pages(make_user, assign, login, board):
+    user = make_user("Ada")
+    for day in range(1, 4):
+        assign(user, datetime(2099, 1, day))
+
+    response = login(user).get("/tasks/status")
+    assert response.status_code == 200
+    assert response.data.count(b'<div class="task-title">Orientation</div>') == 3
+    response = login(board).get(f"/tasks/user?user_id={user.id}")
+    assert response.data.count(b'<div class="task-title">Orientation</div>') == 3
+
+
+def walk_overview(**kwargs):
+    rows, cursor = [], None
+    while True:
+        page = task_overview_page(cursor=cursor, today=WEDNESDAY, **kwargs)
+        rows += page.items
+        if page.next_cursor is None:
+            return rows
+        cursor = page.next_cursor
+
+
+def test_task_overview_counts(board, make_user, assign):
+    ada, linus = make_user("Ada"), make_user("Linus")
+    assign(ada, datetime(2024, 1, 2))                 # overdue
+    assign(ada, datetime(2024, 1, 3), "done")         # finished, not overdue
+    assign(ada, datetime(2024, 1, 4), "graded")
+    assign(ada, datetime(2024, 1, 20))                # upcoming
+    assign(ada, datetime(2024, 1, 12))                # upcoming, sooner
+    assign(linus, datetime(2024, 1, 30), "done")
+
+    rows = {row.name: row for row in task_overview_page(today=WEDNESDAY).items}
+    assert set(rows) == {"Ada", "Board Member", "Linus"}
+    ada_row = rows["Ada"]
+    assert (ada_row.pending, ada_row.done, ada_row.graded, ada_row.overdue) == (3, 1, 1, 1)
+    assert str(ada_row.next_due).startswith("2024-01-12")
+    board_row = rows["Board Member"]  # no assignments at all
+    assert (board_row.pending, board_row.done, board_row.graded, board_row.overdue, board_row.next_due) == (0, 0, 0, 0, None)
+    assert (rows["Linus"].pending, rows["Linus"].done, rows["Linus"].next_due) == (0, 1, None)
+
+
+def test_task_overview_sorts_and_pages(board, make_user, assign):
+    users = [make_user(name) for name in ("Dee", "Bea", "Cal", "Abe", "Eve")]
+    for user, overdue in zip(users, (2, 0, 2, 1, 0)):
+        for _ in range(overdue):
+            assign(user, datetime(2024, 1, 2))
+
+    by_name = walk_overview(limit=2)
+    assert [row.name for row in by_name] == ["Abe", "Bea", "Board Member", "Cal", "Dee", "Eve"]
+
+    by_overdue = walk_overview(limit=2, sort="overdue")
+    # most overdue first; ties by newest id so the cursor stays stable across pages
+    assert [(row.name, row.overdue) for row in by_overdue] == [
+        ("Cal", 2), ("Dee", 2), ("Abe", 1), ("Eve", 0), ("Bea", 0), ("Board Member", 0),
+    ]
+
+
+def test_task_overview_route(board, make_user, assign, login):
+    assign(make_user("Ada"), datetime(2024, 1, 2))
+    client = login(board)
+    response = client.get("/tasks/status?sort=overdue&limit=1")
+    assert response.status_code == 200
+    assert b"Ada" in response.data
+    assert b"/tasks/status?sort=overdue&amp;limit=1&amp;cursor=" in response.data  # page size kept
+    assert client.get("/tasks/status?sort=bogus").status_code == 200
@@ -0,0 +1,214 @@
+import contextlib
+import hashlib
+import io
+import os
+import time
+
+import pytest
+from werkzeug.datastructures import FileStorage
+from werkzeug.http import parse_options_header
+from project import db, uploads
+from project.models import Document
+from project.uploads import BLOB_GRACE_SECONDS, UploadTooLarge, blob_path, release_blobs, stage_upload
+
+
+@pytest.fixture
+def store(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, "UPLOAD_PATH", str(tmp_path))
+    monkeypatch.setitem(app.config, "BLOB_PATH", str(tmp_path / "blobs"))
+    return tmp_path
+
+
+def temp_files(store):
+    return [name for name in os.listdir(store) if name.startswith(".upload-")]
+
+
+def test_stage_hashes_while_streaming(store, monkeypatch):
+    monkeypatch.setattr("project.uploads.CHUNK_SIZE", 7)  # several chunks
+    data = b"%PDF-1.4 " + b"x" * 100
+    staged = stage_upload(FileStorage(io.BytesIO(data), "form.pdf"), str(store), 1024)
+    assert (staged.size, staged.sha256) == (len(data), hashlib.sha256(data).hexdigest())
+
+    staged.commit(str(store / "form.pdf"))
+    assert (store / "form.pdf").read_bytes() == data
+    assert temp_files(store) == []
+
+
+def test_too_large_upload_leaves_nothing(store):
+    with pytest.raises(UploadTooLarge):
+        stage_upload(FileStorage(io.BytesIO(b"x" * 2048), "big.pdf"), str(store), 1024)
+    assert temp_files(store) == []
+
+
+def sha(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def upload(client, *files):
+    data = {"description": "forms", "file": [(io.BytesIO(body), name) for name, body in files]}
+    return client.post("/documents/status", data=data, content_type="multipart/form-data")
+
+
+def test_upload_batch_in_one_transaction(store, make_user, login):
+    user = make_user()
+    response = upload(login(user), ("a.pdf", b"%PDF a"), ("../b c.pdf", b"%PDF b"))
+    assert response.status_code == 200
+
+    docs = db.session.execute(db.select(Document.filename, Document.description, Document.sha256)).all()
+    assert sorted(docs) == [("a.pdf", "forms", sha(b"%PDF a")), ("b_c.pdf", "forms", sha(b"%PDF b"))]
+    with open(blob_path(sha(b"%PDF b")), "rb") as f:
+        assert f.read() == b"%PDF b"
+    assert temp_files(store) == []
+
+
+def test_one_oversized_file_rejects_the_batch(app, store, make_user, login, monkeypatch):
+    monkeypatch.setitem(app.config, "MAX_UPLOAD_BYTES", 1024 * 1024)
+    response = upload(login(make_user()), ("a.pdf", b"%PDF a"), ("big.pdf", b"x" * (1024 * 1024 + 1)))
+    assert b"larger than the 1 MB limit" in response.data
+    assert db.session.scalar(db.select(db.func.count()).select_from(Document)) == 0
+    assert os.listdir(store) == []
+
+
+def stage(store, data):
+    staged = stage_upload(FileStorage(io.BytesIO(data), "form.pdf"), str(store), 1024)
+    staged.commit(blob_path(staged.sha256))
+    return staged
+
+
+def test_same_content_is_stored_once(store):
+    first = stage(store, b"%PDF-1.4 same")
+    second = stage(store, b"%PDF-1.4 same")
+
+    assert first.path == second.path == blob_path(first.sha256)
+    assert first.path.startswith(os.path.join(str(store), "blobs", first.sha256[:2], first.sha256[2:4]))
+    assert first.created and not second.created
+    assert temp_files(store) == []
+
+    # dropping the second upload must not take the shared blob with it
+    second.discard()
+    assert os.path.exists(first.path)
+    # nor the first: the second upload reused (touched) the blob it created
+    first.discard()
+    assert os.path.exists(first.path)
+
+
+def test_discard_waits_for_the_blob_lock(store, monkeypatch):
+    staged = stage(store, b"%PDF-1.4 locked")
+    locked = []
+    real_lock = uploads.blob_lock
+
+    @contextlib.contextmanager
+    def recording_lock(path):
+        with real_lock(path):
+            locked.append(path)
+            yield
+
+    monkeypatch.setattr("project.uploads.blob_lock", recording_lock)
+    staged.discard()
+    assert locked == [staged.path]
+    assert not os.path.exists(staged.path)
+
+
+def test_blob_deleted_with_its_last_reference(store, make_user, make_document, monkeypatch):
+    monkeypatch.setattr("project.uploads.BLOB_GRACE_SECONDS", 0)
+    staged = stage(store, b"%PDF-1.4 shared")
+    user = make_user()
+    first = make_document(user, sha256=staged.sha256)
+    second = make_document(user, sha256=staged.sha256)
+
+    db.session.delete(first)
+    db.session.commit()
+    release_blobs([staged.sha256, None])
+    assert os.path.exists(staged.path)
+
+    db.session.delete(second)
+    db.session.commit()
+    release_blobs([staged.sha256])
+    assert not os.path.exists(staged.path)
+
+
+def test_deleting_a_user_keeps_shared_blobs(store, board, make_user, login, monkeypatch):
+    monkeypatch.setattr("project.uploads.BLOB_GRACE_SECONDS", 0)
+    alice, bob = make_user("Alice"), make_user("Bob")
+    upload(login(alice), ("mine.pdf", b"%PDF alice"), ("shared.pdf", b"%PDF shared"))
+    upload(login(bob), ("shared.pdf", b"%PDF shared"))
+
+    login(board).post("/delete/user", data={"user_id": alice.id, "user_name": "Alice"})
+    assert not os.path.exists(blob_path(sha(b"%PDF alice")))
+    assert os.path.exists(blob_path(sha(b"%PDF shared")))
+
+
+def test_recent_blobs_survive_release(store):
+    # an upload may have reused the blob without committing its Document yet
+    staged = stage(store, b"%PDF-1.4 fresh")
+    release_blobs([staged.sha256])
+    assert os.path.exists(staged.path)
+
+    old = time.time() - BLOB_GRACE_SECONDS - 1
+    os.utime(staged.path, (old, old))
+    release_blobs([staged.sha256])
+    assert not os.path.exists(staged.path)
+
+
+def test_reusing_a_blob_restarts_its_grace_period(store):
+    first = stage(store, b"%PDF-1.4 reused")
+    old = time.time() - BLOB_GRACE_SECONDS - 1
+    os.utime(first.path, (old, old))
+
+    second = stage(store, b"%PDF-1.4 reused")
+    assert not second.created
+    release_blobs([first.sha256])
+    assert os.path.exists(first.path)
+
+
+@pytest.fixture
+def stored_pdf(store, board, make_document):
+    data = b"%PDF-1.4 " + bytes(range(256)) * 3
+    staged = stage(store, data)
+    return make_document(board, sha256=staged.sha256), data
+
+
+def test_view_pdf_ranges_and_caching(board, login, stored_pdf):
+    doc, data = stored_pdf
+    client = login(board)
+
+    full = client.get(f"/view/{doc.id}")
+    assert full.status_code == 200
+    assert full.data == data
+    assert full.get_etag() == (doc.sha256, False)
+    assert full.headers["Accept-Ranges"] == "bytes"
+    assert full.cache_control.private and full.cache_control.immutable
+    assert full.cache_control.max_age == 365 * 24 * 60 * 60
+
+    part = client.get(f"/view/{doc.id}", headers={"Range": "bytes=10-19"})
+    assert part.status_code == 206
+    assert part.data == data[10:20]
+
+    repeat = client.get(f"/view/{doc.id}", headers={"If-None-Match": f'"{doc.sha256}"'})
+    assert repeat.status_code == 304
+    assert repeat.data == b""
+
+
+def test_view_pdf_through_nginx(app, board, login, stored_pdf, monkeypatch):
+    monkeypatch.setitem(app.config, "X_ACCEL_REDIRECT_PREFIX", "/protected/")
+    doc, _ = stored_pdf
+    client = login(board)
+
+    response = client.get(f"/view/{doc.id}")
+    assert response.data == b""
+    assert response.headers["X-Accel-Redirect"] == f"/protected/blobs/{doc.sha256[:2]}/{doc.sha256[2:4]}/{doc.sha256}"
+    assert parse_options_header(response.headers["Content-Disposition"]) == ("inline", {"filename": "form.pdf.pdf"})
+    assert response.get_etag() == (doc.sha256, False)
+
+    assert client.get(f"/view/{doc.id}", headers={"If-None-Match": f'"{doc.sha256}"'}).status_code == 304
+
+
+def test_nginx_filename_is_encoded(app, board, login, stored_pdf, monkeypatch):
+    monkeypatch.setitem(app.config, "X_ACCEL_REDIRECT_PREFIX", "/protected/")
+    doc, _ = stored_pdf
+    doc.filename = 'Résumé "final"'
+    db.session.commit()
+
+    header = login(board).get(f"/view/{doc.id}").headers["Content-Disposition"]
+    assert header == """inline; filename="Resume \\"final\\".pdf"; filename*=UTF-8''R%C3%A9sum%C3%A9%20%22final%22.pdf"""
+    assert parse_options_header(header) == ("inline", {"filename": 'Résumé "final".pdf'})
@@ -0,0 +1,105 @@
+from project import db
+from project.models import User
+from project.users import UserRow, search_users, user_rows_page
+
+
+def names(page):
+    return [user.name for user in page.items]
+
+
+def test_prefix_matches_name_and_email(make_user):
+    make_user("John Smith", email="jsmith@example.com")
+    make_user("Joanna Smithers", email="jo@example.com")
+    make_user("Ada Lovelace", email="countess@example.com")
+
+    assert names(search_users("jo sm")) == ["Joanna Smithers", "John Smith"]
+    assert names(search_users("countess")) == ["Ada Lovelace"]
+    assert names(search_users("smith jo")) == ["Joanna Smithers", "John Smith"]  # word order doesn't matter
+    assert names(search_users("zz")) == []
+
+
+def test_role_filter_and_no_query(make_user):
+    make_user("Ada", role="board")
+    make_user("Grace", role="intern")
+    make_user("Alan", role="intern")
+
+    assert names(search_users(role="intern")) == ["Alan", "Grace"]
+    assert names(search_users("a", role="board")) == ["Ada"]
+    assert names(search_users()) == ["Ada", "Alan", "Grace"]
+
+
+def test_index_follows_renames_and_deletes(make_user):
+    user = make_user("Grace Hopper", email="grace@example.com")
+    make_user("Ada Lovelace")
+
+    user.name = "Rear Admiral Hopper"
+    db.session.commit()
+    assert names(search_users("grace")) == ["Rear Admiral Hopper"]  # email still indexed
+    assert names(search_users("admiral")) == ["Rear Admiral Hopper"]
+
+    db.session.execute(db.update(User).where(User.id == user.id).values(email="amazing@example.com"))
+    db.session.commit()
+    assert names(search_users("grace")) == []
+    assert names(search_users("amaz")) == ["Rear Admiral Hopper"]
+
+    db.session.delete(user)
+    db.session.commit()
+    assert names(search_users("admiral")) == []
+    assert names(search_users("ada")) == ["Ada Lovelace"]
+
+
+def test_pages_alphabetically(make_user):
+    for name in ("Dee", "Abe", "Cal", "Bea"):
+        make_user(f"{name} Tester")
+    first = search_users("tester", limit=3)
+    second = search_users("tester", cursor=first.next_cursor, limit=3)
+    assert names(first) + names(second) == ["Abe Tester", "Bea Tester", "Cal Tester", "Dee Tester"]
+    assert second.next_cursor is None
+
+
+def test_typeahead_json(board, make_user, login):
+    ada = make_user("Ada Lovelace", role="intern")
+    make_user("Adam Smith")
+    client = login(board)
+
+    data = client.get("/users/search/json?q=ada&role=intern").get_json()
+    assert data == {"items": [{"id": ada.id, "name": "Ada Lovelace", "email": ada.email, "role": "intern",
+                               "avatar": "/avatars/default-thumb.webp"}], "next_cursor": None}
+    data = client.get("/users/search/json?q=ada&role=nonsense").get_json()
+    assert [item["name"] for item in data["items"]] == ["Ada Lovelace", "Adam Smith"]
+
+
+def test_user_list_page(board, make_user, login):
+    make_user("Ada Lovelace")
+    response = login(board).get("/user/list?q=lovel")
+    assert response.status_code == 200
+    assert b"Ada Lovelace" in response.data and b"Board Member" not in response.data
+
+    make_user("Ada Byron")
+    response = login(board).get("/user/list?q=ada&limit=1")
+    assert b"/user/list?q=ada&amp;limit=1&amp;cursor=" in response.data  # page size kept
+
+
+def test_user_rows_page(make_user):
+    make_user("Zed", role="intern")
+    make_user("Ada")
+    db.session.expunge_all()
+
+    page = user_rows_page()
+    assert page.items == [
+        UserRow(page.items[0].id, "Ada", "ada@example.com", "volunteer", "default.jpeg"),
+        UserRow(page.items[1].id, "Zed", "zed@example.com", "intern", "default.jpeg"),
+    ]
+    assert not any(isinstance(obj, User) for obj in db.session)  # nothing loaded into the session
+    assert [row.name for row in user_rows_page(role="intern").items] == ["Zed"]
+
+
+def test_board_lists_page_users(board, make_user, login):
+    for name in ("Abe", "Bea", "Cal"):
+        make_user(name)
+    client = login(board)
+    for url in ("/hours/log", "/documents/status"):
+        response = client.get(f"{url}?limit=2")
+        assert response.status_code == 200
+        assert b"Abe" in response.data and b"Cal" not in response.data
+        assert f"{url}?limit=2&amp;cursor=".encode() in response.data  # page size kept